@@ -0,0 +1 @@
+python3 src/benchmark.py --output bench_output.txt "$@"
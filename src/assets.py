@@ -0,0 +1,205 @@
+import contextlib
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from atomicwrite import atomic_write, temp_path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ASSET_MANIFEST_NAME = ".assets.json"
+CHECKS = ("mtime", "hash")
+FICLONE = 0x40049409
+COPY_CHUNK = 1 << 30
+
+# Errors meaning "this mechanism can't be used here", after which the next
+# one is tried.
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.EPERM,
+    errno.EBADF,
+}
+
+
+def find_assets(static_dir):
+    if not os.path.isdir(static_dir):
+        raise FileNotFoundError(f"Static directory not found: {static_dir}")
+    assets = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            assets.append(os.path.relpath(os.path.join(root, name), static_dir))
+    return assets
+
+
+def file_digest(path):
+    with open(path, "rb") as fp:
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+def is_unchanged(source_stat, source, destination, check):
+    try:
+        destination_stat = os.stat(destination)
+    except OSError:
+        return False
+    if os.path.samestat(source_stat, destination_stat):
+        return True
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if check == "hash":
+        return file_digest(source) == file_digest(destination)
+    return source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+
+def _reflink(source, destination, size):
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _copy_file_range(source, destination, size):
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        copied = 0
+        while copied < size:
+            sent = os.copy_file_range(src.fileno(), dst.fileno(), COPY_CHUNK)
+            if sent == 0:
+                break
+            copied += sent
+
+
+def _sendfile(source, destination, size):
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        copied = 0
+        while copied < size:
+            sent = os.sendfile(dst.fileno(), src.fileno(), copied, COPY_CHUNK)
+            if sent == 0:
+                break
+            copied += sent
+
+
+def _copy(source, destination, size):
+    shutil.copyfile(source, destination)
+
+
+# Cheapest first: a reflink shares extents on CoW filesystems (btrfs, XFS),
+# copy_file_range can do the same or copy inside the kernel, and sendfile
+# at least avoids user-space buffers.
+COPY_METHODS = [
+    ("reflink", _reflink, fcntl is not None and sys.platform == "linux"),
+    ("copy_file_range", _copy_file_range, hasattr(os, "copy_file_range")),
+    ("sendfile", _sendfile, hasattr(os, "sendfile")),
+    ("copy", _copy, True),
+]
+
+
+class AssetSync:
+    # Mirrors a static directory into the output directory. Files are only
+    # transferred when they changed, and outputs whose source disappeared
+    # are removed, using a manifest of what the previous sync produced.
+    def __init__(self, static_dir, output_dir, check="mtime", link=False, workers=8):
+        if check not in CHECKS:
+            raise ValueError(f"Unknown change check: {check}")
+        self.static_dir = static_dir
+        self.output_dir = output_dir
+        self.check = check
+        self.workers = workers
+        self.methods = [
+            (name, method) for name, method, available in COPY_METHODS if available
+        ]
+        if link:
+            self.methods.insert(0, ("hardlink", self._hardlink))
+
+    def _hardlink(self, source, destination, size):
+        os.link(source, destination)
+
+    def transfer(self, source, destination, size):
+        # Tries each mechanism in turn and drops the ones this filesystem
+        # rejects, so later files go straight to one that works.
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        tmp_path = temp_path(destination)
+        for name, method in list(self.methods):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            try:
+                method(source, tmp_path, size)
+            except OSError as error:
+                if error.errno not in _UNSUPPORTED or name == "copy":
+                    with contextlib.suppress(OSError):
+                        os.remove(tmp_path)
+                    raise
+                with contextlib.suppress(ValueError):
+                    self.methods.remove((name, method))
+                continue
+            if name != "hardlink":
+                shutil.copystat(source, tmp_path)
+            os.replace(tmp_path, destination)
+            return name
+        raise OSError(f"No copy method worked for {source}")
+
+    def sync_file(self, asset):
+        source = os.path.join(self.static_dir, asset)
+        destination = os.path.join(self.output_dir, asset)
+        source_stat = os.stat(source)
+        if is_unchanged(source_stat, source, destination, self.check):
+            return None, 0
+        size = source_stat.st_size
+        return self.transfer(source, destination, size), size
+
+    def run(self):
+        start = time.perf_counter()
+        assets = find_assets(self.static_dir)
+        previous = load_asset_manifest(self.output_dir)
+        stats = {
+            "copied": 0,
+            "unchanged": 0,
+            "removed": 0,
+            "bytes_copied": 0,
+            "methods": {},
+        }
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for method, size in executor.map(self.sync_file, assets):
+                if method is None:
+                    stats["unchanged"] += 1
+                    continue
+                stats["copied"] += 1
+                stats["bytes_copied"] += size
+                stats["methods"][method] = stats["methods"].get(method, 0) + 1
+
+        for asset in sorted(set(previous) - set(assets)):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(self.output_dir, asset))
+            stats["removed"] += 1
+
+        save_asset_manifest(self.output_dir, assets)
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+
+def load_asset_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, ASSET_MANIFEST_NAME)) as fp:
+            assets = json.load(fp)
+    except (OSError, ValueError):
+        return []
+    return assets if isinstance(assets, list) else []
+
+
+def save_asset_manifest(output_dir, assets):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, ASSET_MANIFEST_NAME)
+    atomic_write(path, json.dumps(assets).encode("utf-8"))
+
+
+def sync_assets(static_dir, output_dir, check="mtime", link=False, workers=8):
+    return AssetSync(static_dir, output_dir, check, link, workers).run()
@@ -0,0 +1,31 @@
+import contextlib
+import os
+
+_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def temp_path(path):
+    # A name next to path that no other process or thread is using, so
+    # concurrent builds writing the same file never share a temporary file.
+    return f"{path}.{os.getpid()}.{os.urandom(4).hex()}.tmp"
+
+
+def atomic_write(path, data):
+    # Writes data to a temporary file next to path and renames it into
+    # place, so readers see either the old file or the new one, never a
+    # partial write. The temporary file is removed if anything fails.
+    while True:
+        tmp_path = temp_path(path)
+        try:
+            fd = os.open(tmp_path, _FLAGS, 0o666)
+        except FileExistsError:
+            continue
+        break
+    try:
+        with open(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,631 @@
+import argparse
+import html
+import json
+import multiprocessing
+import platform
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from build import render_page
+from corpus import ADVERSARIAL, generate_corpus, generate_tree
+from diskcache import InlineDiskCache
+from htmlnode import LeafNode, ParentNode, escape_attribute, escape_text
+from imagesize import ImageSizeCache
+from iopipeline import run_pipeline
+from mdextraction import extract_markdown_images, extract_markdown_links
+from sharednodes import NodeTable
+from splitnodes import (
+    reparse_textnodes,
+    scan_inline,
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_html_many,
+    text_to_textnodes,
+    text_to_textnodes_many,
+)
+from textbatch import text_to_textnode_batch
+from templates import Template
+from textnode import TextNode, TextType, render_textnodes, text_node_to_html_node
+
+TAGS = {
+    TextType.TEXT: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+
+def best_time(func, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def corpus_for(config):
+    return generate_corpus(config.paragraphs, config.words, config.density, config.seed)
+
+
+def timed(name, func, amount, unit, config):
+    seconds = best_time(func, repeat=config.repeat)
+    return [
+        (name, seconds * 1000, "ms"),
+        (f"{name}/throughput", amount / seconds, unit),
+    ]
+
+
+def bench_stages(config):
+    corpus = corpus_for(config)
+    megabytes = sum(map(len, corpus)) / 1e6
+    text_nodes = [[TextNode(text, TextType.TEXT)] for text in corpus]
+    parsed = [text_to_textnodes(text) for text in corpus]
+    flat = [node for nodes in parsed for node in nodes]
+    tree = ParentNode(
+        "div",
+        [
+            ParentNode("p", [text_node_to_html_node(n) for n in nodes])
+            for nodes in parsed
+        ],
+    )
+    html_megabytes = len(tree.to_html()) / 1e6
+
+    def split_delimiter():
+        for nodes in text_nodes:
+            split_nodes_delimiter(nodes, "**", TextType.BOLD)
+
+    def split_image():
+        for nodes in text_nodes:
+            split_nodes_image(nodes)
+
+    def split_link():
+        for nodes in text_nodes:
+            split_nodes_link(nodes)
+
+    def parse(engine):
+        return lambda: [text_to_textnodes(text, engine) for text in corpus]
+
+    def convert():
+        for node in flat:
+            text_node_to_html_node(node)
+
+    results = []
+    for name, func, amount, unit in [
+        ("split_nodes_delimiter", split_delimiter, megabytes, "MB/s"),
+        ("split_nodes_image", split_image, megabytes, "MB/s"),
+        ("split_nodes_link", split_link, megabytes, "MB/s"),
+        ("text_to_textnodes/scan", parse("scan"), megabytes, "MB/s"),
+        ("text_to_textnodes/passes", parse("passes"), megabytes, "MB/s"),
+        ("text_node_to_html_node", convert, len(flat) / 1e6, "Mnodes/s"),
+        ("ParentNode.to_html", tree.to_html, html_megabytes, "MB/s"),
+    ]:
+        results += timed(f"stages/{name}", func, amount, unit, config)
+    return results
+
+
+def recursive_to_html(node):
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    children_html = "".join(recursive_to_html(child) for child in node.children)
+    return f"<{node.tag}{node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def bench_render(config):
+    results = []
+    for name, tree in [
+        ("wide", generate_tree(depth=3, breadth=12, leaves=10)),
+        ("deep", generate_tree(depth=300, breadth=1)),
+    ]:
+        megabytes = len(tree.to_html()) / 1e6
+        for renderer, func in [
+            ("recursive", recursive_to_html),
+            ("iterative", ParentNode.to_html),
+        ]:
+            results += timed(
+                f"render/{name}/{renderer}",
+                lambda: func(tree),
+                megabytes,
+                "MB/s",
+                config,
+            )
+    return results
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+class DictParentNode:
+    def __init__(self, tag, children, props=None):
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
+
+
+NODE_CLASSES = {
+    "dict": (DictTextNode, DictLeafNode, DictParentNode),
+    "slots": (TextNode, LeafNode, ParentNode),
+}
+
+
+def build_paragraphs(corpus, text_node, leaf_node, parent_node):
+    paragraphs = []
+    nodes = 0
+    for text in corpus:
+        text_nodes = [
+            text_node(text[start:end], text_type, url)
+            for text_type, start, end, url in scan_inline(text)
+        ]
+        leaves = []
+        for node in text_nodes:
+            if node.text_type == TextType.LINK:
+                leaves.append(leaf_node("a", node.text, {"href": node.url}))
+            elif node.text_type == TextType.IMAGE:
+                leaves.append(leaf_node("img", "", {"src": node.url, "alt": node.text}))
+            else:
+                leaves.append(leaf_node(TAGS[node.text_type], node.text))
+        paragraphs.append((text_nodes, parent_node("p", leaves)))
+        nodes += 2 * len(text_nodes) + 1
+    return paragraphs, nodes
+
+
+def measure_memory(variant, corpus_args, trace, results):
+    corpus = generate_corpus(*corpus_args)
+    if trace:
+        tracemalloc.start()
+    paragraphs, nodes = build_paragraphs(corpus, *NODE_CLASSES[variant])
+    if trace:
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.put(traced / nodes)
+    else:
+        results.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+
+
+def run_isolated(target, *args):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=target, args=(*args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def bench_memory(config):
+    full = (config.memory_paragraphs, config.words, config.density, config.seed)
+    sample = (config.memory_paragraphs // 10, *full[1:])
+    results = []
+    for variant in NODE_CLASSES:
+        per_node = run_isolated(measure_memory, variant, sample, True)
+        peak_rss = run_isolated(measure_memory, variant, full, False)
+        results.append((f"memory/{variant}/per-node", per_node, "B"))
+        results.append((f"memory/{variant}/peak-rss", peak_rss / 2**20, "MiB"))
+    return results
+
+
+def render_textnode_list(text):
+    nodes = text_to_textnodes(text)
+    return "".join(text_node_to_html_node(node).to_html() for node in nodes)
+
+
+def render_textnode_batch(text):
+    return text_to_textnode_batch(text).to_html()
+
+
+def bench_batch(config):
+    text = " ".join(corpus_for(config))
+    megabytes = len(text) / 1e6
+    results = []
+    for name, parse, render in [
+        ("list", text_to_textnodes, render_textnode_list),
+        ("batch", text_to_textnode_batch, render_textnode_batch),
+    ]:
+        tracemalloc.start()
+        nodes = parse(text)
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append((f"batch/{name}/parsed-size", traced / len(nodes), "B/span"))
+        del nodes
+        results += timed(
+            f"batch/{name}/render", lambda: render(text), megabytes, "MB/s", config
+        )
+    return results
+
+
+def bench_inline_render(config):
+    nodes = [node for text in corpus_for(config) for node in text_to_textnodes(text)]
+
+    def via_leaf_nodes():
+        leaves = [text_node_to_html_node(node) for node in nodes]
+        return leaves, [leaf.to_html() for leaf in leaves]
+
+    def direct():
+        return render_textnodes(nodes)
+
+    results = []
+    for name, func in [("leafnode", via_leaf_nodes), ("direct", direct)]:
+        # Intermediates are kept alive until the end of each call, so the
+        # traced size counts everything the path allocates.
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        seconds = best_time(func, repeat=config.repeat)
+        results.append((f"inline-render/{name}/allocated", peak / len(nodes), "B/span"))
+        results.append((f"inline-render/{name}", seconds * 1e9 / len(nodes), "ns/span"))
+    return results
+
+
+def bench_escape(config):
+    clean = corpus_for(config)
+    dirty = [text.replace(" ", " & ").replace("a", "<a>") for text in clean]
+    megabytes = sum(map(len, clean)) / 1e6
+    table = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+    results = []
+    for corpus_name, corpus in [("clean", clean), ("dirty", dirty)]:
+        for name, func in [
+            ("escape_text", escape_text),
+            ("escape_attribute", escape_attribute),
+            ("html.escape", html.escape),
+            ("str.translate", lambda text: text.translate(table)),
+        ]:
+            results += timed(
+                f"escape/{corpus_name}/{name}",
+                lambda: [func(text) for text in corpus],
+                megabytes,
+                "MB/s",
+                config,
+            )
+    return results
+
+
+def bench_disk_cache(config):
+    corpus = corpus_for(config)
+    megabytes = sum(map(len, corpus)) / 1e6
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "inline.bin")
+        with InlineDiskCache(path) as cache:
+            for text in corpus:
+                cache.text_to_html(text)
+
+        results = timed(
+            "disk-cache/cold",
+            lambda: [render_textnodes(text_to_textnodes(text)) for text in corpus],
+            megabytes,
+            "MB/s",
+            config,
+        )
+        results += timed(
+            "disk-cache/load", lambda: InlineDiskCache(path), megabytes, "MB/s", config
+        )
+        cache = InlineDiskCache(path)
+        results += timed(
+            "disk-cache/warm",
+            lambda: [cache.text_to_html(text) for text in corpus],
+            megabytes,
+            "MB/s",
+            config,
+        )
+        results.append(("disk-cache/file-size", os.path.getsize(path) / 1e6, "MB"))
+    return results
+
+
+def bench_adversarial(config, sizes=(10_000, 80_000)):
+    results = []
+    for input_name, make_input in ADVERSARIAL.items():
+        small, large = (make_input(size) for size in sizes)
+        for func_name, func in [
+            ("extract_markdown_images", extract_markdown_images),
+            ("extract_markdown_links", extract_markdown_links),
+            (
+                "split_nodes_link",
+                lambda text: split_nodes_link([TextNode(text, TextType.TEXT)]),
+            ),
+            ("text_to_textnodes", text_to_textnodes),
+        ]:
+            small_time = best_time(func, small, repeat=config.repeat)
+            large_time = best_time(func, large, repeat=config.repeat)
+            name = f"adversarial/{input_name}/{func_name}"
+            results.append((name, large_time * 1000, "ms"))
+            results.append((f"{name}/scaling", large_time / small_time, "x"))
+    return results
+
+
+def site_chrome():
+    links = [LeafNode("a", f"Section {i}", {"href": f"/s{i}/"}) for i in range(20)]
+    items = [ParentNode("li", [link]) for link in links]
+    footer = [LeafNode("p", "Copyright & friends"), LeafNode("a", "Top", {"href": "#"})]
+    return ParentNode("nav", [ParentNode("ul", items)]), ParentNode("footer", footer)
+
+
+def build_pages(config, table):
+    pages = []
+    for text in corpus_for(config):
+        # Every page builds its own chrome, as a template would.
+        nav, footer = site_chrome()
+        if table is not None:
+            nav, footer = table.intern(nav), table.intern(footer)
+        main = ParentNode("main", [LeafNode("p", text)])
+        pages.append(ParentNode("body", [nav, main, footer]))
+    return pages
+
+
+def bench_shared(config):
+    results = []
+    for name, table in [("plain", None), ("shared", NodeTable())]:
+        tracemalloc.start()
+        pages = build_pages(config, table)
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append((f"shared/{name}/tree-size", traced / len(pages), "B/page"))
+        results += timed(
+            f"shared/{name}/render",
+            lambda: [page.to_html() for page in pages],
+            len(pages),
+            "pages/s",
+            config,
+        )
+        if table is not None:
+            stats = table.stats()
+            results.append(("shared/intern-hit-rate", stats["hit_rate"] * 100, "%"))
+            results.append(
+                ("shared/render-hit-rate", stats["render_hit_rate"] * 100, "%")
+            )
+            results.append(("shared/bytes-saved", stats["bytes_saved"] / 1e6, "MB"))
+    return results
+
+
+def bench_many(config):
+    # Table cells, list items and headings: many short strings, most of them
+    # without any markup.
+    cells = [
+        " ".join(text.split()[:4]) for text in corpus_for(config) for _ in range(10)
+    ]
+    results = []
+    for name, single, many in [
+        ("textnodes", text_to_textnodes, text_to_textnodes_many),
+        (
+            "html",
+            lambda text: render_textnodes(text_to_textnodes(text)),
+            text_to_html_many,
+        ),
+    ]:
+        results += timed(
+            f"many/{name}/per-call",
+            lambda: [single(text) for text in cells],
+            len(cells),
+            "strings/s",
+            config,
+        )
+        results += timed(
+            f"many/{name}/batch",
+            lambda: list(many(cells)),
+            len(cells),
+            "strings/s",
+            config,
+        )
+    return results
+
+
+def bench_io(config, pages=200, latency=0.002):
+    # Simulates a network-mounted volume by sleeping before every read and
+    # write of real files in a temporary directory.
+    corpus = corpus_for(config)
+    with tempfile.TemporaryDirectory() as tmp:
+        names = [f"page{i}" for i in range(pages)]
+        for i, name in enumerate(names):
+            with open(os.path.join(tmp, name + ".md"), "w") as fp:
+                fp.write("\n\n".join(corpus[i % len(corpus) :][:5]))
+
+        def read(name):
+            time.sleep(latency)
+            with open(os.path.join(tmp, name + ".md"), "rb") as fp:
+                return fp.read()
+
+        def write(name, html):
+            time.sleep(latency)
+            with open(os.path.join(tmp, name + ".html"), "wb") as fp:
+                fp.write(html)
+
+        def sequential():
+            for name in names:
+                write(name, render_page(read(name)))
+
+        results = timed("io/sequential", sequential, pages, "pages/s", config)
+        for concurrency in (4, 16):
+            results += timed(
+                f"io/pipeline-{concurrency}",
+                lambda: run_pipeline(
+                    names,
+                    read,
+                    lambda name, data: render_page(data),
+                    write,
+                    concurrency,
+                ),
+                pages,
+                "pages/s",
+                config,
+            )
+    return results
+
+
+def bench_images(config, images=2000):
+    png = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + bytes(8) + bytes(64 * 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"{i}.png") for i in range(images)]
+        for path in paths:
+            with open(path, "wb") as fp:
+                fp.write(png)
+        cache_path = os.path.join(tmp, "images.json")
+        cache = ImageSizeCache(cache_path)
+        results = timed(
+            "images/probe",
+            lambda: [ImageSizeCache().size(path) for path in paths],
+            images,
+            "images/s",
+            config,
+        )
+        for path in paths:
+            cache.size(path)
+        cache.save()
+        cache = ImageSizeCache(cache_path)
+        results += timed(
+            "images/cached",
+            lambda: [cache.size(path) for path in paths],
+            images,
+            "images/s",
+            config,
+        )
+    return results
+
+
+def bench_reparse(config):
+    # One-character edits to a single long string, as an editor preview
+    # would send them.
+    text = " ".join(corpus_for(config))
+    nodes = text_to_textnodes(text)
+    middle = text.index(" ", len(text) // 2)
+    results = timed(
+        "reparse/full", lambda: text_to_textnodes(text), 1, "edits/s", config
+    )
+    for name, offset, removed in [
+        ("replace-middle", middle, 1),
+        ("insert-middle", middle, 0),
+        ("insert-end", len(text), 0),
+    ]:
+        results += timed(
+            f"reparse/{name}",
+            lambda: reparse_textnodes(text, nodes, offset, removed, " "),
+            1,
+            "edits/s",
+            config,
+        )
+    return results
+
+
+def page_shell():
+    # A typical page shell: a few KB of static head, navigation and footer
+    # around the title and content.
+    nav, footer = site_chrome()
+    styles = "".join(f".c{i} {{ margin: {i}px; }}\n" for i in range(100))
+    return (
+        f"<!DOCTYPE html><html><head><title>{{{{ title }}}}</title>"
+        f"<style>{styles}</style></head><body>{nav.to_html()}"
+        f"<h1>{{{{ title }}}}</h1><main>{{{{ content }}}}</main>"
+        f"{footer.to_html()}</body></html>"
+    )
+
+
+def bench_template(config):
+    text = page_shell()
+    template = Template(text)
+    pages = [
+        (f"Page {i} & more", ParentNode("div", [LeafNode("p", paragraph)]))
+        for i, paragraph in enumerate(corpus_for(config))
+    ]
+    rendered = [(title, node.to_html()) for title, node in pages]
+
+    def naive():
+        for title, html in rendered:
+            page = text.replace("{{ title }}", escape_text(title))
+            page.replace("{{ content }}", html).encode("utf-8")
+
+    def compiled():
+        for title, html in rendered:
+            template.render({"title": title, "content": html.encode("utf-8")})
+
+    def compiled_nodes():
+        for title, node in pages:
+            template.render({"title": title, "content": node})
+
+    results = timed(
+        "template/compile", lambda: Template(text), 1, "templates/s", config
+    )
+    for name, func in [
+        ("str-replace", naive),
+        ("compiled", compiled),
+        ("compiled-nodes", compiled_nodes),
+    ]:
+        results += timed(f"template/{name}", func, len(pages), "pages/s", config)
+    return results
+
+
+BENCHMARKS = {
+    "stages": bench_stages,
+    "render": bench_render,
+    "memory": bench_memory,
+    "batch": bench_batch,
+    "inline-render": bench_inline_render,
+    "escape": bench_escape,
+    "disk-cache": bench_disk_cache,
+    "adversarial": bench_adversarial,
+    "shared": bench_shared,
+    "many": bench_many,
+    "io": bench_io,
+    "images": bench_images,
+    "reparse": bench_reparse,
+    "template": bench_template,
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("benchmarks", nargs="*", help=", ".join(BENCHMARKS))
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--memory-paragraphs", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results to this file as JSON")
+    config = parser.parse_args(argv)
+    for name in config.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+    return config
+
+
+def main(argv):
+    config = parse_args(argv)
+    results = []
+    for name in config.benchmarks or BENCHMARKS:
+        for label, value, unit in BENCHMARKS[name](config):
+            print(f"{label:60} {value:12.3f} {unit}")
+            results.append({"name": label, "value": value, "unit": unit})
+
+    if config.output:
+        report = {
+            "python": platform.python_version(),
+            "parameters": {
+                key: value
+                for key, value in vars(config).items()
+                if key not in ("benchmarks", "output")
+            },
+            "results": results,
+        }
+        with open(config.output, "w") as fp:
+            json.dump(report, fp, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,174 @@
+import io
+import mmap
+import re
+from enum import Enum
+
+from htmlnode import LeafNode, ParentNode
+from splitnodes import text_to_textnodes
+from textnode import render_textnodes
+
+
+class BlockType(Enum):
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+
+HEADING = re.compile(r"(#{1,6}) (.*)", re.DOTALL)
+
+FENCE = "```"
+
+
+RELEASE_BYTES = 8 * 2**20
+
+
+def iter_file_lines(path):
+    # Maps the file and reads it a line at a time, so only the current line
+    # is decoded. Pages already consumed are dropped every RELEASE_BYTES so
+    # resident memory stays flat however large the file is.
+    with open(path, "rb") as fp:
+        try:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            for line in fp:
+                yield line.decode("utf-8")
+            return
+        with mapped:
+            can_release = hasattr(mapped, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+            if can_release:
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            for line in iter(mapped.readline, b""):
+                yield line.decode("utf-8")
+                consumed = mapped.tell() // mmap.PAGESIZE * mmap.PAGESIZE
+                if can_release and consumed - released >= RELEASE_BYTES:
+                    mapped.madvise(mmap.MADV_DONTNEED, released, consumed - released)
+                    released = consumed
+
+
+def iter_blocks(lines):
+    block = []
+    fenced = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if fenced:
+            block.append(line)
+            if stripped.endswith(FENCE):
+                yield "\n".join(block).strip()
+                block = []
+                fenced = False
+        elif stripped.startswith(FENCE):
+            if block:
+                yield "\n".join(block).strip()
+            block = [line]
+            fenced = len(stripped) < 2 * len(FENCE) or not stripped.endswith(FENCE)
+            if not fenced:
+                yield stripped
+                block = []
+        elif not stripped:
+            if block:
+                yield "\n".join(block).strip()
+                block = []
+        else:
+            block.append(line)
+    if block:
+        yield "\n".join(block).strip()
+
+
+def iter_file_blocks(path):
+    return iter_blocks(iter_file_lines(path))
+
+
+def _is_ordered_list(lines):
+    return all(line.startswith(f"{i}. ") for i, line in enumerate(lines, 1))
+
+
+def block_to_block_type(block):
+    if HEADING.match(block):
+        return BlockType.HEADING
+    if (
+        len(block) >= 2 * len(FENCE)
+        and block.startswith(FENCE)
+        and block.endswith(FENCE)
+    ):
+        return BlockType.CODE
+    lines = block.split("\n")
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith(("- ", "* ")) for line in lines):
+        return BlockType.UNORDERED_LIST
+    if _is_ordered_list(lines):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def render_inline(text, image_size=None):
+    return render_textnodes(text_to_textnodes(text), image_size=image_size)
+
+
+def _join_lines(lines):
+    return " ".join(line.strip() for line in lines if line.strip())
+
+
+def heading_parts(block):
+    # Returns (level, text) for a heading block, its lines joined.
+    hashes, text = HEADING.match(block).groups()
+    return len(hashes), _join_lines(text.split("\n"))
+
+
+def block_to_html_node(block, render_inline=render_inline):
+    def inline(tag, text):
+        return ParentNode(tag, [LeafNode(None, render_inline(text), raw=True)])
+
+    lines = block.split("\n")
+    match block_to_block_type(block):
+        case BlockType.HEADING:
+            level, text = heading_parts(block)
+            return inline(f"h{level}", text)
+        case BlockType.CODE:
+            code = block[len(FENCE) : -len(FENCE)]
+            if "\n" in code:
+                code = code[code.index("\n") + 1 :]
+            return ParentNode("pre", [LeafNode("code", code)])
+        case BlockType.QUOTE:
+            text = _join_lines(line[1:] for line in lines)
+            return inline("blockquote", text)
+        case BlockType.UNORDERED_LIST:
+            return ParentNode("ul", [inline("li", line[2:].strip()) for line in lines])
+        case BlockType.ORDERED_LIST:
+            items = [line.split(". ", 1)[1].strip() for line in lines]
+            return ParentNode("ol", [inline("li", item) for item in items])
+        case _:
+            return inline("p", _join_lines(lines))
+
+
+def markdown_blocks(markdown):
+    # Split on "\n" only, like iter_file_lines, so a page renders the same
+    # whether it is built from a string or streamed from a file.
+    return iter_blocks(markdown.split("\n"))
+
+
+def blocks_to_html_node(blocks, render_inline=render_inline):
+    return ParentNode("div", [block_to_html_node(b, render_inline) for b in blocks])
+
+
+def markdown_to_html_node(markdown, render_inline=render_inline):
+    return blocks_to_html_node(markdown_blocks(markdown), render_inline)
+
+
+def iter_markdown_file_html(path, render_inline=render_inline):
+    yield "<div>"
+    for block in iter_file_blocks(path):
+        yield from block_to_html_node(block, render_inline).iter_html()
+    yield "</div>"
+
+
+def write_markdown_file(path, fp, render_inline=render_inline, encoding="utf-8"):
+    chunks = iter_markdown_file_html(path, render_inline)
+    if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+        chunks = (chunk.encode(encoding) for chunk in chunks)
+    fp.writelines(chunks)
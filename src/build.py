@@ -0,0 +1,434 @@
+import functools
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from atomicwrite import atomic_write
+from blocks import (
+    BlockType,
+    block_to_block_type,
+    blocks_to_html_node,
+    heading_parts,
+    markdown_blocks,
+    render_inline,
+)
+from diskcache import InlineDiskCache
+from imagesize import ImageSizeCache, local_image_resolver
+from iopipeline import run_pipeline
+from splitnodes import text_to_textnodes
+from templates import load_template
+
+BUILD_VERSION = 4
+MANIFEST_NAME = ".manifest.json"
+IMAGE_CACHE_NAME = ".images.json"
+SOURCE_SUFFIX = ".md"
+OUTPUT_SUFFIX = ".html"
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class PageError(Exception):
+    # A page that failed to render; the message starts with its source path.
+    pass
+
+
+def page_title(blocks):
+    # The text of the first level-1 heading block, without inline markup.
+    for block in blocks:
+        if block_to_block_type(block) != BlockType.HEADING:
+            continue
+        level, text = heading_parts(block)
+        if level == 1:
+            return "".join(node.text for node in text_to_textnodes(text))
+    return ""
+
+
+def render_page(source, render_inline=render_inline, template=None):
+    # The blocks are split once and shared by the content and the title.
+    blocks = list(markdown_blocks(source.decode("utf-8")))
+    node = blocks_to_html_node(blocks, render_inline)
+    if template is not None:
+        return template.render({"content": node, "title": page_title(blocks)})
+    return node.to_html().encode("utf-8")
+
+
+def find_sources(content_dir):
+    if not os.path.isdir(content_dir):
+        raise FileNotFoundError(f"Content directory not found: {content_dir}")
+    sources = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(SOURCE_SUFFIX):
+                path = os.path.join(root, name)
+                sources.append(os.path.relpath(path, content_dir))
+    return sources
+
+
+def output_path(output_dir, source):
+    return os.path.join(output_dir, source[: -len(SOURCE_SUFFIX)] + OUTPUT_SUFFIX)
+
+
+def load_manifest(output_dir, options=None):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as fp:
+            manifest = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("pages"), dict):
+        return {}
+    pages = manifest["pages"]
+    # Pages built by another version or with different rendering options
+    # have to be rebuilt. They are still listed, without entries, so the
+    # outputs of sources deleted since get removed.
+    if manifest.get("version") != BUILD_VERSION or manifest.get("options", {}) != (
+        options or {}
+    ):
+        return dict.fromkeys(pages)
+    return pages
+
+
+def save_manifest(output_dir, pages, options=None):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {"version": BUILD_VERSION, "options": options or {}, "pages": pages}
+    atomic_write(path, json.dumps(manifest, sort_keys=True).encode("utf-8"))
+
+
+def images_unchanged(images):
+    # images holds [path, size, mtime_ns] for each image file a page looked
+    # at, with size and mtime_ns None for files that didn't exist.
+    for path, size, mtime_ns in images:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if size is not None:
+                return False
+            continue
+        if size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+            return False
+    return True
+
+
+def is_current(entry, source_digest, path):
+    if entry is None or entry["source"] != source_digest:
+        return False
+    try:
+        if os.stat(path).st_size != entry["size"]:
+            return False
+    except OSError:
+        return False
+    return images_unchanged(entry.get("images", ()))
+
+
+def page_entry(source_digest, output_digest, html, images=None):
+    entry = {"source": source_digest, "output": output_digest, "size": len(html)}
+    if images:
+        entry["images"] = images
+    return entry
+
+
+def output_unchanged(path, data, output_digest, entry):
+    # Trusts the manifest's digest when it has one for a file of the right
+    # size, and otherwise digests what is on disk.
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return False
+    if size != len(data):
+        return False
+    if entry is not None and entry["size"] == size:
+        return entry["output"] == output_digest
+    with open(path, "rb") as fp:
+        return digest(fp.read()) == output_digest
+
+
+def write_page(path, data, output_digest=None, entry=None):
+    # Returns False without touching the file, or its mtime, when it already
+    # holds exactly this data. Otherwise replaces it atomically, so readers
+    # never see a partial page.
+    if output_digest is None:
+        output_digest = digest(data)
+    if output_unchanged(path, data, output_digest, entry):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, data)
+    return True
+
+
+def save_page(output_dir, old_pages, source, source_digest, html, images=None):
+    output_digest = digest(html)
+    path = output_path(output_dir, source)
+    written = write_page(path, html, output_digest, old_pages.get(source))
+    return page_entry(source_digest, output_digest, html, images), written
+
+
+def inline_renderer(cache=None, image_size=None):
+    if image_size is not None:
+        return functools.partial(render_inline, image_size=image_size)
+    if cache is not None:
+        return cache.text_to_html
+    return render_inline
+
+
+class PageRenderer:
+    # Renders a page's source to HTML bytes. With image_root, local images
+    # get their sizes, relative URLs resolving against the page's directory,
+    # and render() also returns the image files the page depends on.
+    def __init__(
+        self, render_inline=render_inline, template=None, image_root=None, cache=None
+    ):
+        self.render_inline = render_inline
+        self.template = template
+        self.image_root = image_root
+        self.image_cache = cache
+
+    def render(self, source, data):
+        try:
+            return self._render(source, data)
+        except Exception as error:
+            raise PageError(f"{source}: {error}") from error
+
+    def _render(self, source, data):
+        if self.image_root is None:
+            return render_page(data, self.render_inline, self.template), None
+        used = {}
+        image_size = local_image_resolver(
+            self.image_root, self.image_cache, os.path.dirname(source), used
+        )
+        html = render_page(data, inline_renderer(None, image_size), self.template)
+        images = [
+            [path, *(signature or (None, None))]
+            for path, signature in sorted(used.items())
+        ]
+        return html, images
+
+
+_worker_renderer = PageRenderer()
+
+
+def init_worker(cache_path, image_root=None, image_cache_path=None, template_path=None):
+    # Workers read the inline and image caches but never save them; the
+    # serial build is what keeps them warm. The template is compiled once
+    # per worker.
+    global _worker_renderer
+    cache = image_cache = template = None
+    if cache_path is not None:
+        cache = InlineDiskCache(cache_path)
+    if image_root is not None:
+        image_cache = ImageSizeCache(image_cache_path)
+    if template_path is not None:
+        template = load_template(template_path)
+    _worker_renderer = PageRenderer(
+        inline_renderer(cache), template, image_root, image_cache
+    )
+
+
+def render_file(path, source):
+    start = time.perf_counter()
+    with open(path, "rb") as fp:
+        html, images = _worker_renderer.render(source, fp.read())
+    return html, images, os.getpid(), time.perf_counter() - start
+
+
+def render_parallel(content_dir, sources, jobs, worker_args=(None,)):
+    # Workers receive source paths and send back rendered bytes, so node
+    # trees never cross process boundaries.
+    paths = [os.path.join(content_dir, source) for source in sources]
+    chunksize = max(1, len(paths) // (jobs * 8))
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker, initargs=worker_args
+    ) as executor:
+        yield from executor.map(render_file, paths, sources, chunksize=chunksize)
+
+
+def read_source(content_dir, output_dir, old_pages, source):
+    # Returns the source digest, plus its contents only when the page has to
+    # be rebuilt.
+    with open(os.path.join(content_dir, source), "rb") as fp:
+        data = fp.read()
+    source_digest = digest(data)
+    entry = old_pages.get(source)
+    if is_current(entry, source_digest, output_path(output_dir, source)):
+        return source_digest, None
+    return source_digest, data
+
+
+def render_source(source, loaded, renderer=None):
+    source_digest, data = loaded
+    if data is None:
+        return source_digest, None
+    start = time.perf_counter()
+    html, images = (renderer or _worker_renderer).render(source, data)
+    return source_digest, (html, images, os.getpid(), time.perf_counter() - start)
+
+
+def write_rendered(output_dir, old_pages, source, rendered):
+    source_digest, result = rendered
+    if result is None:
+        return None
+    html, images, worker, seconds = result
+    entry, written = save_page(
+        output_dir, old_pages, source, source_digest, html, images
+    )
+    return entry, worker, seconds, written
+
+
+def build_pipelined(
+    content_dir,
+    output_dir,
+    sources,
+    old_pages,
+    jobs,
+    worker_args,
+    renderer,
+    io,
+):
+    # Reads and writes overlap with rendering; pages are rendered in worker
+    # processes when jobs > 1, otherwise on one thread, since the inline
+    # cache is not thread-safe.
+    if jobs > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_worker,
+            initargs=worker_args,
+        )
+        process = render_source
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+        process = functools.partial(render_source, renderer=renderer)
+    with executor:
+        return run_pipeline(
+            sources,
+            functools.partial(read_source, content_dir, output_dir, old_pages),
+            process,
+            functools.partial(write_rendered, output_dir, old_pages),
+            concurrency=io,
+            executor=executor,
+        )
+
+
+def build_site(
+    content_dir,
+    output_dir,
+    jobs=1,
+    cache_path=None,
+    io=None,
+    image_root=None,
+    template_path=None,
+):
+    # With image_root, local images get width/height attributes read from
+    # the files under it (usually the static directory), and pages are
+    # rebuilt when those files change. With template_path, each page's HTML
+    # fills the template's {{ content }} slot and the plain text of its first
+    # level-1 heading fills {{ title }}.
+    if image_root is not None and cache_path is not None:
+        raise ValueError("Image sizes can't be combined with the inline cache")
+    start = time.perf_counter()
+    cache = image_cache = template = None
+    image_cache_path = os.path.join(output_dir, IMAGE_CACHE_NAME)
+    if cache_path is not None and jobs == 1:
+        cache = InlineDiskCache(cache_path)
+    if image_root is not None and jobs == 1:
+        image_cache = ImageSizeCache(image_cache_path)
+    worker_args = (cache_path, image_root, image_cache_path, template_path)
+    options = {"image_sizes": True} if image_root is not None else {}
+    if template_path is not None:
+        template = load_template(template_path)
+        # Editing the template changes every page, so it rebuilds them all.
+        with open(template_path, "rb") as fp:
+            options["template"] = digest(fp.read())
+    renderer = PageRenderer(inline_renderer(cache), template, image_root, image_cache)
+    old_pages = load_manifest(output_dir, options)
+    pages = {}
+    stats = {
+        "built": 0,
+        "skipped": 0,
+        "removed": 0,
+        "written": 0,
+        "unchanged": 0,
+        "bytes_saved": 0,
+        "workers": {},
+    }
+    pending = []
+
+    def record(source, entry, worker, seconds, written):
+        pages[source] = entry
+        stats["built"] += 1
+        if written:
+            stats["written"] += 1
+        else:
+            stats["unchanged"] += 1
+            stats["bytes_saved"] += entry["size"]
+        worker_stats = stats["workers"].setdefault(worker, {"pages": 0, "seconds": 0})
+        worker_stats["pages"] += 1
+        worker_stats["seconds"] += seconds
+
+    def write_and_record(source, source_digest, html, images, worker, seconds):
+        entry, written = save_page(
+            output_dir, old_pages, source, source_digest, html, images
+        )
+        record(source, entry, worker, seconds, written)
+
+    sources = find_sources(content_dir)
+    if io is not None:
+        results = build_pipelined(
+            content_dir,
+            output_dir,
+            sources,
+            old_pages,
+            jobs,
+            worker_args,
+            renderer,
+            io,
+        )
+        for source, result in zip(sources, results):
+            if result is None:
+                pages[source] = old_pages[source]
+                stats["skipped"] += 1
+            else:
+                record(source, *result)
+        sources = []
+
+    for source in sources:
+        with open(os.path.join(content_dir, source), "rb") as fp:
+            data = fp.read()
+        source_digest = digest(data)
+        entry = old_pages.get(source)
+        if is_current(entry, source_digest, output_path(output_dir, source)):
+            pages[source] = entry
+            stats["skipped"] += 1
+        elif jobs > 1:
+            pending.append((source, source_digest))
+        else:
+            render_start = time.perf_counter()
+            html, images = renderer.render(source, data)
+            seconds = time.perf_counter() - render_start
+            write_and_record(source, source_digest, html, images, os.getpid(), seconds)
+
+    if pending:
+        sources = [source for source, _ in pending]
+        results = render_parallel(content_dir, sources, jobs, worker_args)
+        for (source, source_digest), result in zip(pending, results):
+            write_and_record(source, source_digest, *result)
+
+    for source in old_pages.keys() - pages.keys():
+        try:
+            os.remove(output_path(output_dir, source))
+        except FileNotFoundError:
+            pass
+        stats["removed"] += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    save_manifest(output_dir, pages, options)
+    if cache is not None:
+        cache.save()
+        stats["cache"] = cache.stats()
+    if image_cache is not None:
+        image_cache.save()
+        stats["images"] = image_cache.stats()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
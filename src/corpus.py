@@ -0,0 +1,66 @@
+import random
+
+from htmlnode import LeafNode, ParentNode
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+MARKUP = ("bold", "italic", "code", "link", "image")
+
+
+def markup_word(rng, word):
+    match rng.choice(MARKUP):
+        case "bold":
+            return f"**{word}**"
+        case "italic":
+            return f"_{word}_"
+        case "code":
+            return f"`{word}`"
+        case "link":
+            return f"[{word}](https://example.com/{word}/{rng.randrange(1000)})"
+        case "image":
+            return f"![{word}](https://example.com/img/{rng.randrange(1000)}.png)"
+
+
+def generate_paragraph(rng, words, density):
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if rng.random() < density:
+            word = markup_word(rng, word)
+        parts.append(word)
+    return " ".join(parts)
+
+
+def generate_corpus(paragraphs, words=60, density=0.1, seed=0):
+    rng = random.Random(seed)
+    return [generate_paragraph(rng, words, density) for _ in range(paragraphs)]
+
+
+def generate_markdown(paragraphs, words=60, density=0.1, seed=0):
+    return "\n\n".join(generate_corpus(paragraphs, words, density, seed))
+
+
+def generate_tree(depth, breadth, leaves=4):
+    node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text ")] * leaves)
+    for level in range(depth):
+        node = ParentNode("div", [node] * breadth, {"class": f"level-{level}"})
+    return node
+
+
+# Inputs that trigger worst-case behaviour in naive bracket and delimiter
+# matching, each built from a repeat count.
+ADVERSARIAL = {
+    "open-brackets": lambda n: "[" * n,
+    "open-images": lambda n: "![" * n,
+    "unclosed-parens": lambda n: "[a](" * n,
+    "bracket-parens": lambda n: "](" * n,
+    "unclosed-link": lambda n: "[" + "](" * n,
+    "alternating": lambda n: "[]" * n + "(",
+    "bangs": lambda n: "!" * n + "[a]",
+    "stars": lambda n: "**" * n,
+    "plain": lambda n: "word " * n,
+}
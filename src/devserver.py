@@ -0,0 +1,270 @@
+import ctypes
+import ctypes.util
+import mimetypes
+import os
+import posixpath
+import select
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from build import OUTPUT_SUFFIX, SOURCE_SUFFIX, render_page
+from inlinecache import InlineCache
+
+POLL_INTERVAL = 0.1
+
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+WATCH_MASK |= IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+def scan_sources(content_dir):
+    # Maps each source to (mtime_ns, size), which is all the watcher looks
+    # at to decide what to re-render. Uses scandir directly because a poll
+    # has to stat every source.
+    if not os.path.isdir(content_dir):
+        raise FileNotFoundError(f"Content directory not found: {content_dir}")
+    sources = {}
+    stack = [("", content_dir)]
+    while stack:
+        prefix, path = stack.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append((prefix + entry.name + os.sep, entry.path))
+                elif entry.name.endswith(SOURCE_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    sources[prefix + entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return sources
+
+
+def source_signature(content_dir, source):
+    try:
+        stat = os.stat(os.path.join(content_dir, source))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def page_url(source):
+    return "/" + source[: -len(SOURCE_SUFFIX)].replace(os.sep, "/") + OUTPUT_SUFFIX
+
+
+class DevSite:
+    # Rendered pages kept in memory, keyed by URL path. refresh() re-renders
+    # only the sources whose mtime or size changed since they were rendered,
+    # passing render errors to report.
+    def __init__(self, content_dir, static_dir=None, report=print):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.report = report
+        self.pages = {}
+        self.sources = {}
+        self.inline_cache = InlineCache()
+
+    def render(self, source):
+        with open(os.path.join(self.content_dir, source), "rb") as fp:
+            data = fp.read()
+        html = render_page(data, self.inline_cache.text_to_html)
+        self.pages[page_url(source)] = html
+
+    def refresh(self, sources=None):
+        # Checks the given sources, or the whole content tree when None.
+        start = time.perf_counter()
+        if sources is None:
+            signatures = scan_sources(self.content_dir)
+            sources = signatures.keys() | self.sources.keys()
+        else:
+            signatures = {
+                source: source_signature(self.content_dir, source) for source in sources
+            }
+        rendered = removed = 0
+        for source in sorted(sources):
+            signature = signatures.get(source)
+            if signature is None:
+                if self.sources.pop(source, None) is not None:
+                    self.pages.pop(page_url(source), None)
+                    removed += 1
+                continue
+            if self.sources.get(source) == signature:
+                continue
+            self.sources[source] = signature
+            rendered += 1
+            try:
+                self.render(source)
+            except Exception as error:
+                # A half-typed edit shouldn't stop the server; keep the last
+                # good page and retry on the next save.
+                self.report(f"Error rendering {source}: {error}")
+        return {
+            "rendered": rendered,
+            "removed": removed,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def resolve(self, url_path):
+        # Returns (content type, bytes) for a request path, or None.
+        path = unquote(url_path.split("?", 1)[0].split("#", 1)[0]).lstrip("/")
+        path = posixpath.normpath("/" + path)
+        index = path.rstrip("/") + "/index" + OUTPUT_SUFFIX
+        for candidate in (path, path + OUTPUT_SUFFIX, index):
+            page = self.pages.get(candidate)
+            if page is not None:
+                return "text/html; charset=utf-8", page
+        if self.static_dir is None:
+            return None
+        file_path = os.path.join(self.static_dir, path.lstrip("/"))
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, "rb") as fp:
+            data = fp.read()
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        return content_type, data
+
+
+class InotifyWatcher:
+    # Linux inotify through ctypes, so an edit is noticed without statting
+    # the whole tree. wait() returns the changed sources, or None when
+    # something happened that needs a full rescan (directory changes or a
+    # queue overflow).
+    def __init__(self, content_dir):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.content_dir = content_dir
+        self.dirs = {}
+        self.watch_tree()
+
+    @classmethod
+    def create(cls, content_dir):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return cls(content_dir)
+        except (OSError, AttributeError):
+            return None
+
+    def watch_tree(self):
+        for root, dirs, _ in os.walk(self.content_dir):
+            wd = self._add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"Cannot watch {root}")
+            prefix = os.path.relpath(root, self.content_dir)
+            self.dirs[wd] = "" if prefix == "." else prefix + os.sep
+
+    def wait(self, timeout):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        changed = set()
+        rescan = False
+        try:
+            while True:
+                data = os.read(self.fd, 64 * 1024)
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                    offset += _EVENT.size
+                    name = data[offset : offset + length].rstrip(b"\0")
+                    offset += length
+                    if mask & (IN_ISDIR | IN_Q_OVERFLOW | IN_DELETE_SELF):
+                        rescan = True
+                    elif name and wd in self.dirs:
+                        changed.add(self.dirs[wd] + os.fsdecode(name))
+        except BlockingIOError:
+            pass
+        if rescan:
+            self.watch_tree()
+            return None
+        return {source for source in changed if source.endswith(SOURCE_SUFFIX)}
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        found = self.server.site.resolve(self.path)
+        if found is None:
+            self.send_error(404)
+            return
+        content_type, body = found
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(site, host="127.0.0.1", port=8000):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.site = site
+    return server
+
+
+def watch(site, stop, interval=POLL_INTERVAL, report=print, use_inotify=True):
+    # Re-renders changed pages until stop is set, reporting each rebuild.
+    # Falls back to polling the whole tree every interval without inotify.
+    watcher = InotifyWatcher.create(site.content_dir) if use_inotify else None
+    try:
+        while not stop.is_set():
+            if watcher is None:
+                if stop.wait(interval):
+                    break
+                stats = site.refresh()
+            else:
+                changed = watcher.wait(interval)
+                if changed == set():
+                    continue
+                stats = site.refresh(changed)
+            if stats["rendered"] or stats["removed"]:
+                report(
+                    f"Rebuilt {stats['rendered']} pages, removed {stats['removed']} "
+                    f"in {stats['seconds'] * 1000:.1f} ms"
+                )
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+
+def serve(
+    content_dir, static_dir=None, host="127.0.0.1", port=8000, interval=POLL_INTERVAL
+):
+    site = DevSite(content_dir, static_dir)
+    stats = site.refresh()
+    print(f"Rendered {stats['rendered']} pages in {stats['seconds']:.2f}s")
+    server = make_server(site, host, port)
+    stop = threading.Event()
+    watcher = threading.Thread(target=watch, args=(site, stop, interval), daemon=True)
+    watcher.start()
+    print(f"Serving on http://{host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+    return 0
@@ -0,0 +1,147 @@
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import zlib
+from collections import OrderedDict
+
+from atomicwrite import atomic_write
+from splitnodes import PARSER_VERSION, text_to_textnodes
+from textnode import TextNode, TextType, render_textnodes
+
+MAGIC = b"SSGC"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHI")
+
+TYPE_CODES = tuple(TextType)
+
+_CODE_OF = {text_type: code for code, text_type in enumerate(TYPE_CODES)}
+
+# Entries are only valid for the parser that produced them and for the
+# marshal format of the running interpreter.
+STAMP = (FORMAT_VERSION, PARSER_VERSION, tuple(sys.version_info[:2]))
+
+_NODES = b"n"
+_HTML = b"h"
+
+
+def cache_key(kind, text):
+    return kind + hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class InlineDiskCache:
+    # Persistent cache of parsed TextNode lists and rendered inline HTML,
+    # keyed by a hash of the source text. Entries are kept as marshalled
+    # bytes and only decoded on a hit, so loading is a single read plus one
+    # marshal.loads. Saving writes a temporary file and renames it over the
+    # cache, so concurrent builds never see a partial file; an unreadable or
+    # stale cache file is treated as empty.
+    def __init__(self, path, max_bytes=64 * 2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        self._entries.clear()
+        self.size = 0
+        try:
+            with open(self.path, "rb") as fp:
+                data = fp.read()
+        except OSError:
+            return
+        try:
+            magic, version, checksum = HEADER.unpack_from(data)
+            body = memoryview(data)[HEADER.size :]
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return
+            if zlib.crc32(body) != checksum:
+                return
+            stamp, entries = marshal.loads(body)
+        except (struct.error, ValueError, EOFError, TypeError):
+            return
+        if stamp != STAMP:
+            return
+        for key, payload in entries:
+            self._store(key, payload)
+        self._dirty = False
+
+    def save(self):
+        if not self._dirty:
+            return
+        body = marshal.dumps((STAMP, list(self._entries.items())))
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, zlib.crc32(body))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        atomic_write(self.path, header + body)
+        self._dirty = False
+
+    def _store(self, key, payload):
+        size = len(key) + len(payload)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = payload
+        self.size += size
+        while self.size > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted_key) + len(evicted)
+            self.evictions += 1
+        self._dirty = True
+
+    def _lookup(self, key):
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return payload
+
+    def text_to_textnodes(self, text):
+        key = cache_key(_NODES, text)
+        payload = self._lookup(key)
+        if payload is not None:
+            return [
+                TextNode(node_text, TYPE_CODES[code], url, start, end)
+                for node_text, code, url, start, end in marshal.loads(payload)
+            ]
+        nodes = text_to_textnodes(text)
+        # Spans are kept too, so a hit returns the same nodes as a miss.
+        encoded = tuple(
+            (node.text, _CODE_OF[node.text_type], node.url, node.start, node.end)
+            for node in nodes
+        )
+        self._store(key, marshal.dumps(encoded))
+        return nodes
+
+    def text_to_html(self, text):
+        key = cache_key(_HTML, text)
+        payload = self._lookup(key)
+        if payload is not None:
+            return payload.decode("utf-8")
+        html = render_textnodes(text_to_textnodes(text))
+        self._store(key, html.encode("utf-8"))
+        return html
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
@@ -1,49 +1,119 @@
+import io
+
+
+# Clean strings, the common case, are detected with a few C-level scans and
+# returned as-is; dirty ones are escaped with chained str.replace calls.
+def escape_text(text):
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value):
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+
+
 class HTMLNode:
-    def __init__(self, tag=None, value=None, children=None, props=None):
+    __slots__ = ("tag", "value", "children", "props", "raw")
+
+    def __init__(self, tag=None, value=None, children=None, props=None, raw=False):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
+        self.raw = raw
 
     def to_html(self):
         raise NotImplementedError("Subclasses must implement to_html")
 
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_html(self, fp, encoding="utf-8"):
+        chunks = self.iter_html()
+        if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+            chunks = (chunk.encode(encoding) for chunk in chunks)
+        fp.writelines(chunks)
+
     def props_to_html(self):
         if not self.props:
             return ""
-        return "".join(f' {key}="{value}"' for key, value in self.props.items())
+        if self.raw:
+            return "".join(f' {key}="{value}"' for key, value in self.props.items())
+        return "".join(
+            f' {key}="{escape_attribute(str(value))}"'
+            for key, value in self.props.items()
+        )
 
     def __repr__(self):
         return f"(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 
 class LeafNode(HTMLNode):
-    def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, None, props)
+    __slots__ = ()
+
+    def __init__(self, tag, value, props=None, raw=False):
+        super().__init__(tag, value, None, props, raw)
 
     def to_html(self):
         if self.value is None:
             raise ValueError("LeafNode must have a value")
+        value = self.value if self.raw else escape_text(self.value)
         if self.tag is None:
-            return self.value
+            return value
         if self.props is not None:
-            return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
-        return f"<{self.tag}>{self.value}</{self.tag}>"
+            return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
+        return f"<{self.tag}>{value}</{self.tag}>"
 
     def __repr__(self):
         return f"(tag={self.tag}, value={self.value}, props={self.props})"
 
 
 class ParentNode(HTMLNode):
-    def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
+    __slots__ = ()
+
+    def __init__(self, tag, children, props=None, raw=False):
+        super().__init__(tag, None, children, props, raw)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def walks_into(self, child):
+        # Whether iter_html expands child in place. Subclasses that override
+        # to_html (such as shared nodes with a cached rendering) are rendered
+        # through it instead.
+        return (
+            isinstance(child, ParentNode) and type(child).to_html is ParentNode.to_html
+        )
+
+    def open_tag(self):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         if self.children is None:
             raise ValueError("ParentNode must have children")
-        children_html = "".join(child.to_html() for child in self.children)
-        return "".join(
-            f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
-        )
+        return f"<{self.tag}{self.props_to_html()}>"
+
+    def iter_html(self):
+        # Walks the tree with an explicit stack of child iterators instead of
+        # recursing, so nesting depth is not limited by the recursion limit.
+        yield self.open_tag()
+        walks_into = self.walks_into
+        stack = [(iter(self.children), f"</{self.tag}>")]
+        while stack:
+            children, close_tag = stack[-1]
+            for child in children:
+                if walks_into(child):
+                    yield child.open_tag()
+                    stack.append((iter(child.children), f"</{child.tag}>"))
+                    break
+                yield child.to_html()
+            else:
+                stack.pop()
+                yield close_tag
@@ -0,0 +1,170 @@
+import json
+import os
+import struct
+
+from atomicwrite import atomic_write
+
+IMAGE_CACHE_VERSION = 1
+HEADER_BYTES = 32
+
+# JPEG start-of-frame markers, which carry the image dimensions. C4, C8 and
+# CC share the range but are not frames.
+_JPEG_FRAMES = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7}
+_JPEG_FRAMES |= {0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _png_size(header, fp):
+    if header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _gif_size(header, fp):
+    return struct.unpack("<HH", header[6:10])
+
+
+def _webp_size(header, fp):
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20] == 0x2F:
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _jpeg_size(header, fp):
+    # Walks the segment headers up to the first frame, seeking over segment
+    # bodies so only a few bytes per segment are read.
+    offset = 2
+    while True:
+        fp.seek(offset)
+        segment = fp.read(9)
+        if len(segment) < 4 or segment[0] != 0xFF:
+            return None
+        marker = segment[1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in _JPEG_FRAMES:
+            if len(segment) < 9:
+                return None
+            height, width = struct.unpack(">HH", segment[5:9])
+            return width, height
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+        offset += 2 + struct.unpack(">H", segment[2:4])[0]
+
+
+_FORMATS = [
+    (lambda h: h.startswith(b"\x89PNG\r\n\x1a\n"), _png_size),
+    (lambda h: h[:6] in (b"GIF87a", b"GIF89a"), _gif_size),
+    (lambda h: h[:4] == b"RIFF" and h[8:12] == b"WEBP", _webp_size),
+    (lambda h: h.startswith(b"\xff\xd8"), _jpeg_size),
+]
+
+
+def probe_image(path):
+    # Returns (width, height) from the file header, or None when the format
+    # is unknown or the header is damaged. Pixel data is never read.
+    with open(path, "rb") as fp:
+        header = fp.read(HEADER_BYTES)
+        for matches, size in _FORMATS:
+            if matches(header):
+                try:
+                    return size(header.ljust(HEADER_BYTES, b"\0"), fp)
+                except struct.error:
+                    return None
+    return None
+
+
+class ImageSizeCache:
+    # Image dimensions keyed by path, valid while the file's size and mtime
+    # are unchanged. Persisted as JSON when a path is given.
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        if path is not None:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == IMAGE_CACHE_VERSION:
+            self.entries = data.get("images", {})
+
+    def save(self):
+        if self.path is None or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {"version": IMAGE_CACHE_VERSION, "images": self.entries}
+        atomic_write(self.path, json.dumps(data).encode("utf-8"))
+        self.dirty = False
+
+    def size(self, path, used=None):
+        # With a used dict, records the file as path -> [size, mtime_ns], or
+        # None when it doesn't exist, so callers can tell when it changes.
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if used is not None:
+                used[key] = None
+            return None
+        if used is not None:
+            used[key] = [stat.st_size, stat.st_mtime_ns]
+        entry = self.entries.get(key)
+        if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+            self.hits += 1
+        else:
+            self.misses += 1
+            try:
+                size = probe_image(path)
+            except OSError:
+                return None
+            entry = [stat.st_size, stat.st_mtime_ns, *(size or (None, None))]
+            self.entries[key] = entry
+            self.dirty = True
+        return None if entry[2] is None else (entry[2], entry[3])
+
+    def stats(self):
+        return {"images": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+def local_image_resolver(root, cache=None, page_dir="", used=None):
+    # Maps image URLs such as "/img/a.png" to files under root, and relative
+    # ones such as "img/a.png" to files under page_dir, the page's directory
+    # relative to root. Remote URLs and paths escaping root resolve to None,
+    # which leaves the tag as is. Files looked at are recorded in used.
+    cache = cache or ImageSizeCache()
+    root = os.path.abspath(root)
+    base = os.path.join(root, page_dir)
+
+    def image_size(url):
+        if not url or "://" in url or url.startswith(("//", "data:")):
+            return None
+        url = url.split("#", 1)[0].split("?", 1)[0]
+        if url.startswith("/"):
+            path = os.path.join(root, url.lstrip("/"))
+        else:
+            path = os.path.join(base, url)
+        path = os.path.normpath(path)
+        if not path.startswith(root + os.sep):
+            return None
+        return cache.size(path, used)
+
+    return image_size
@@ -0,0 +1,79 @@
+import sys
+from collections import OrderedDict
+
+from splitnodes import text_to_textnodes
+from textnode import TextNode, render_textnodes
+
+
+def _nodes_size(nodes):
+    return sys.getsizeof(nodes) + sum(
+        sys.getsizeof(node) + sys.getsizeof(node[0]) for node in nodes
+    )
+
+
+class InlineCache:
+    # Bounded LRU cache of parsed and rendered inline text, keyed on the
+    # input string. Parsed nodes are stored as tuples and rebuilt on every
+    # hit, so callers can't modify what the cache holds.
+    def __init__(self, max_entries=10_000, max_bytes=64 * 2**20):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("InlineCache limits must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def text_to_textnodes(self, text):
+        nodes = self._lookup(("nodes", text), self._parse, _nodes_size)
+        return [TextNode(*node) for node in nodes]
+
+    def text_to_html(self, text):
+        return self._lookup(("html", text), self._render, sys.getsizeof)
+
+    def _parse(self, text):
+        return tuple(
+            (node.text, node.text_type, node.url, node.start, node.end)
+            for node in text_to_textnodes(text)
+        )
+
+    def _render(self, text):
+        return render_textnodes(text_to_textnodes(text))
+
+    def _lookup(self, key, compute, sizeof):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        value = compute(key[1])
+        size = sys.getsizeof(key[1]) + sizeof(value)
+        if size > self.max_bytes:
+            return value
+        self._entries[key] = (value, size)
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+            self.evictions += 1
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
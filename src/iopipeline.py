@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CONCURRENCY = 16
+
+
+async def _run(items, read, process, write, concurrency, executor, io_executor):
+    loop = asyncio.get_running_loop()
+    pending = enumerate(items)
+    results = {}
+    # Bounded queues between the stages: when rendering falls behind, readers
+    # block on put instead of loading the whole site into memory.
+    loaded = asyncio.Queue(maxsize=concurrency)
+    processed = asyncio.Queue(maxsize=concurrency)
+
+    async def reader():
+        for index, item in pending:
+            value = await loop.run_in_executor(io_executor, read, item)
+            await loaded.put((index, item, value))
+
+    async def renderer():
+        while (entry := await loaded.get()) is not None:
+            index, item, value = entry
+            value = await loop.run_in_executor(executor, process, item, value)
+            await processed.put((index, item, value))
+
+    async def writer():
+        while (entry := await processed.get()) is not None:
+            index, item, value = entry
+            results[index] = await loop.run_in_executor(io_executor, write, item, value)
+
+    async def stage(worker, downstream):
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        for _ in range(concurrency):
+            await downstream.put(None)
+
+    await asyncio.gather(
+        stage(reader, loaded),
+        stage(renderer, processed),
+        *(writer() for _ in range(concurrency)),
+    )
+    return [results[index] for index in range(len(results))]
+
+
+def run_pipeline(
+    items, read, process, write, concurrency=DEFAULT_CONCURRENCY, executor=None
+):
+    # Runs read(item) -> process(item, data) -> write(item, result) for every
+    # item, with up to `concurrency` reads and writes in flight on a thread
+    # pool while process runs on `executor` (a thread or process pool; the
+    # I/O pool when None). Returns what write returned, in item order.
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    with ThreadPoolExecutor(max_workers=2 * concurrency) as io_executor:
+        return asyncio.run(
+            _run(
+                items,
+                read,
+                process,
+                write,
+                concurrency,
+                executor or io_executor,
+                io_executor,
+            )
+        )
@@ -0,0 +1,158 @@
+import argparse
+import contextlib
+import sys
+
+from assets import CHECKS, sync_assets
+from blocks import write_markdown_file
+from build import PageError, build_site
+from devserver import POLL_INTERVAL, serve
+from profiling import Profiler
+
+
+def convert_file(source, destination):
+    if destination is None:
+        write_markdown_file(source, sys.stdout)
+        return 0
+    with open(destination, "wb") as fp:
+        write_markdown_file(source, fp)
+    return 0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="main.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="convert a content directory to HTML")
+    build.add_argument("content", nargs="?", default="content")
+    build.add_argument("output", nargs="?", default="public")
+    build.add_argument(
+        "-j", "--jobs", type=int, default=1, help="render pages in N processes"
+    )
+    build.add_argument(
+        "--io",
+        type=int,
+        metavar="N",
+        help="overlap reads and writes with rendering, N files at a time",
+    )
+    build.add_argument("--static", help="mirror this directory into the output")
+    build.add_argument(
+        "--static-check",
+        choices=CHECKS,
+        default="mtime",
+        help="detect changed assets by size and mtime, or by content hash",
+    )
+    build.add_argument(
+        "--link-static",
+        action="store_true",
+        help="hardlink assets instead of copying (edits to outputs change sources)",
+    )
+    build.add_argument(
+        "--image-sizes",
+        action="store_true",
+        help="add width and height to images found under --static",
+    )
+    build.add_argument("--cache", help="persist parsed inline markup in this file")
+    build.add_argument(
+        "--template",
+        help="wrap pages in this file, filling {{ title }} and {{ content }}",
+    )
+    build.add_argument("--profile", action="store_true", help="print per-stage timings")
+    build.add_argument("--profile-json", help="write per-stage timings as JSON")
+    convert = commands.add_parser(
+        "convert", help="stream a single markdown file to HTML"
+    )
+    convert.add_argument("source")
+    convert.add_argument("destination", nargs="?", help="defaults to stdout")
+    server = commands.add_parser(
+        "serve", help="serve a content directory, re-rendering pages on change"
+    )
+    server.add_argument("content", nargs="?", default="content")
+    server.add_argument("--static", help="also serve files from this directory")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8000)
+    server.add_argument(
+        "--interval",
+        type=float,
+        default=POLL_INTERVAL,
+        help="seconds between checks for changed files",
+    )
+    args = parser.parse_args(argv or ["build"])
+
+    if args.command == "convert":
+        return convert_file(args.source, args.destination)
+    if args.command == "serve":
+        return serve(args.content, args.static, args.host, args.port, args.interval)
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.io is not None and args.io < 1:
+        parser.error("--io must be at least 1")
+    if args.image_sizes and args.static is None:
+        parser.error("--image-sizes needs --static")
+    if args.image_sizes and args.cache is not None:
+        parser.error("--image-sizes can't be combined with --cache")
+
+    profiling = args.profile or args.profile_json
+    if profiling and (args.jobs > 1 or args.io is not None):
+        parser.error("--profile only instruments serial builds")
+
+    profiler = Profiler() if profiling else contextlib.nullcontext()
+    try:
+        with profiler:
+            stats = build_site(
+                args.content,
+                args.output,
+                jobs=args.jobs,
+                cache_path=args.cache,
+                io=args.io,
+                image_root=args.static if args.image_sizes else None,
+                template_path=args.template,
+            )
+    except (OSError, PageError) as error:
+        parser.exit(1, f"error: {error}\n")
+    print(
+        f"Built {stats['built']} pages, skipped {stats['skipped']} unchanged, "
+        f"removed {stats['removed']} in {stats['seconds']:.2f}s"
+    )
+    if stats["unchanged"]:
+        print(
+            f"Left {stats['unchanged']} identical pages in place "
+            f"({stats['bytes_saved']} bytes not rewritten)"
+        )
+    if "cache" in stats:
+        cache = stats["cache"]
+        print(f"Inline cache: {cache['hits']} hits, {cache['misses']} misses")
+    if "images" in stats:
+        images = stats["images"]
+        print(f"Image sizes: {images['hits']} cached, {images['misses']} probed")
+    if args.jobs > 1:
+        for worker, worker_stats in sorted(stats["workers"].items()):
+            print(
+                f"  worker {worker}: {worker_stats['pages']} pages "
+                f"in {worker_stats['seconds']:.2f}s"
+            )
+    if args.static is not None:
+        try:
+            assets = sync_assets(
+                args.static, args.output, args.static_check, args.link_static
+            )
+        except OSError as error:
+            parser.exit(1, f"error: {error}\n")
+        methods = ", ".join(
+            f"{count} by {method}"
+            for method, count in sorted(assets["methods"].items())
+        )
+        print(
+            f"Copied {assets['copied']} assets ({methods or 'none'}), "
+            f"{assets['unchanged']} unchanged, removed {assets['removed']} "
+            f"in {assets['seconds']:.2f}s"
+        )
+    if args.profile:
+        print(profiler.summary())
+    if args.profile_json:
+        with open(args.profile_json, "w") as fp:
+            fp.write(profiler.to_json())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
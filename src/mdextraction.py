@@ -1,9 +1,72 @@
-import re
+MAX_LINE_LENGTH = 1 << 20
+
+
+class MarkdownLimitError(ValueError):
+    pass
+
+
+def check_line_length(text):
+    limit = MAX_LINE_LENGTH
+    if len(text) <= limit:
+        return
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        if end - start > limit:
+            raise MarkdownLimitError(
+                f"Markdown line of {end - start} characters exceeds the "
+                f"limit of {limit}"
+            )
+        start = end + 1
+
+
+def _extract(text, opener, is_candidate):
+    # Same matches as re.findall(opener + r"(.*?)\]\((.*?)\)", text), but
+    # the next newline, "](" and ")" are found with cached str.find calls
+    # so the scan stays linear instead of re-reading the line per opener.
+    check_line_length(text)
+    matches = []
+    line_end = close = paren = -1
+    pos = 0
+    while (start := text.find(opener, pos)) != -1:
+        pos = start + 1
+        if not is_candidate(text, start):
+            continue
+        alt_start = start + len(opener)
+        if line_end < start:
+            line_end = text.find("\n", start)
+            if line_end == -1:
+                line_end = len(text)
+        if close < alt_start:
+            close = text.find("](", alt_start)
+            if close == -1:
+                close = len(text)
+        if close >= line_end:
+            continue
+        if paren < close + 2:
+            paren = text.find(")", close + 2)
+            if paren == -1:
+                paren = len(text)
+        if paren >= line_end:
+            continue
+        matches.append((text[alt_start:close], text[close + 2 : paren]))
+        pos = paren + 1
+    return matches
+
+
+def _any(text, start):
+    return True
+
+
+def _not_image(text, start):
+    return start == 0 or text[start - 1] != "!"
 
 
 def extract_markdown_images(text):
-    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+    return _extract(text, "![", _any)
 
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[(.*?)\]\((.*?)\)", text)
+    return _extract(text, "[", _not_image)
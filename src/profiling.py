@@ -0,0 +1,190 @@
+import json
+import sys
+import time
+
+import htmlnode
+import splitnodes
+import textnode
+
+
+def _text_size(nodes):
+    return sum(len(node.text) for node in nodes)
+
+
+def _split(stage):
+    return lambda result, old_nodes, *args, **kwargs: (
+        stage,
+        len(old_nodes),
+        len(result),
+        _text_size(result),
+    )
+
+
+def _parse(stage):
+    return lambda result, text, *args, **kwargs: (
+        stage,
+        1,
+        len(result),
+        _text_size(result),
+    )
+
+
+# (owner, attribute, describe) for every instrumented stage. describe gets
+# the result followed by the call's arguments and returns
+# (stage, nodes in, nodes out, bytes produced). Each one accepts extra
+# arguments, so optional parameters added to a stage don't break profiling.
+STAGES = [
+    (
+        splitnodes,
+        "split_nodes_delimiter",
+        lambda result, old_nodes, delimiter, *args, **kwargs: (
+            f"split_nodes_delimiter[{delimiter}]",
+            len(old_nodes),
+            len(result),
+            _text_size(result),
+        ),
+    ),
+    (splitnodes, "split_nodes_image", _split("split_nodes_image")),
+    (splitnodes, "split_nodes_link", _split("split_nodes_link")),
+    (splitnodes, "text_to_textnodes_scan", _parse("text_to_textnodes[scan]")),
+    (splitnodes, "text_to_textnodes_passes", _parse("text_to_textnodes[passes]")),
+    (
+        textnode,
+        "text_node_to_html_node",
+        lambda result, text_node, *args, **kwargs: (
+            "text_node_to_html_node",
+            1,
+            1,
+            len(result.value),
+        ),
+    ),
+    (
+        textnode,
+        "render_textnodes",
+        lambda result, text_nodes, *args, **kwargs: (
+            "render_textnodes",
+            len(text_nodes) if hasattr(text_nodes, "__len__") else 0,
+            0,
+            len(result),
+        ),
+    ),
+    (
+        htmlnode.LeafNode,
+        "to_html",
+        lambda result, node, *args, **kwargs: ("LeafNode.to_html", 1, 0, len(result)),
+    ),
+    (
+        htmlnode.ParentNode,
+        "to_html",
+        lambda result, node, *args, **kwargs: (
+            f"ParentNode.to_html[{node.tag}]",
+            1,
+            0,
+            len(result),
+        ),
+    ),
+]
+
+
+class StageStats:
+    __slots__ = ("calls", "seconds", "nodes_in", "nodes_out", "bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.nodes_in = 0
+        self.nodes_out = 0
+        self.bytes = 0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Profiler:
+    # Instruments the parsing and rendering stages while active. Stage
+    # functions are swapped for timing wrappers on enter and restored on
+    # exit, so nothing is measured, or slowed down, outside the block.
+    # Times are inclusive: text_to_textnodes[passes] contains the split
+    # stages it calls.
+    active = None
+
+    def __init__(self):
+        self.stages = {}
+        self._patches = []
+
+    def record(self, stage, seconds, nodes_in, nodes_out, size):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.nodes_in += nodes_in
+        stats.nodes_out += nodes_out
+        stats.bytes += size
+
+    def _wrap(self, func, describe):
+        record = self.record
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            result = func(*args, **kwargs)
+            elapsed = clock() - start
+            stage, nodes_in, nodes_out, size = describe(result, *args, **kwargs)
+            record(stage, elapsed, nodes_in, nodes_out, size)
+            return result
+
+        return wrapper
+
+    def _patch(self, owner, name, replacement):
+        original = getattr(owner, name)
+        if isinstance(owner, type):
+            self._patches.append((owner, name, original))
+            setattr(owner, name, replacement)
+            return
+        # Modules that imported the function by name hold their own
+        # reference, so patch those as well.
+        for module in list(sys.modules.values()):
+            if getattr(module, "__dict__", {}).get(name) is original:
+                self._patches.append((module, name, original))
+                setattr(module, name, replacement)
+        for engine, func in splitnodes.ENGINES.items():
+            if func is original:
+                self._patches.append((splitnodes.ENGINES, engine, original))
+                splitnodes.ENGINES[engine] = replacement
+
+    def __enter__(self):
+        if Profiler.active is not None:
+            raise RuntimeError("A Profiler is already active")
+        Profiler.active = self
+        for owner, name, describe in STAGES:
+            self._patch(owner, name, self._wrap(getattr(owner, name), describe))
+        return self
+
+    def __exit__(self, *exc_info):
+        for owner, name, original in reversed(self._patches):
+            if isinstance(owner, dict):
+                owner[name] = original
+            else:
+                setattr(owner, name, original)
+        self._patches.clear()
+        Profiler.active = None
+
+    def to_dict(self):
+        return {stage: stats.to_dict() for stage, stats in sorted(self.stages.items())}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def summary(self):
+        lines = [
+            f"{'stage':36} {'calls':>9} {'ms':>10} {'nodes in':>10} "
+            f"{'nodes out':>10} {'bytes':>12}"
+        ]
+        ordered = sorted(self.stages.items(), key=lambda item: -item[1].seconds)
+        for stage, stats in ordered:
+            lines.append(
+                f"{stage:36} {stats.calls:9} {stats.seconds * 1000:10.2f} "
+                f"{stats.nodes_in:10} {stats.nodes_out:10} {stats.bytes:12}"
+            )
+        return "\n".join(lines)
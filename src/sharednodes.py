@@ -0,0 +1,197 @@
+import sys
+import weakref
+from types import MappingProxyType
+
+from htmlnode import LeafNode, ParentNode
+
+
+def _props_key(props):
+    return None if props is None else tuple(props.items())
+
+
+def _freeze_props(props):
+    return None if props is None else MappingProxyType(dict(props))
+
+
+class _SharedNode:
+    # Mixin for immutable, interned nodes. Leaves, and parents that are
+    # rendered on their own or interned more than once, render once and keep
+    # their HTML, so a subtree shared between pages is only rendered on first
+    # use. Other parents are streamed as part of their ancestor's HTML, so a
+    # deep chain costs its size rather than its depth times its size.
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init_shared(self, tag, value, children, props, raw, table):
+        fields = {
+            "tag": tag,
+            "value": value,
+            "children": children,
+            "props": _freeze_props(props),
+            "raw": raw,
+            "_html": None,
+            "_table": table,
+            "_shared": False,
+        }
+        for name, field in fields.items():
+            object.__setattr__(self, name, field)
+
+    def _store_html(self, html):
+        self._table.render_misses += 1
+        object.__setattr__(self, "_html", html)
+
+    def to_html(self):
+        if self._html is None:
+            self._render()
+        else:
+            self._table.render_hits += 1
+        return self._html
+
+    def iter_html(self):
+        yield self.to_html()
+
+
+class SharedLeafNode(_SharedNode, LeafNode):
+    __slots__ = ("_html", "_table", "_shared", "__weakref__")
+
+    def __init__(self, tag, value, props, raw, table):
+        self._init_shared(tag, value, None, props, raw, table)
+
+    def _render(self):
+        self._store_html(LeafNode.to_html(self))
+
+
+class SharedParentNode(_SharedNode, ParentNode):
+    __slots__ = ("_html", "_table", "_shared", "__weakref__")
+
+    def __init__(self, tag, children, props, raw, table):
+        self._init_shared(tag, None, tuple(children), props, raw, table)
+
+    def walks_into(self, child):
+        # Uncached children that aren't shared are streamed with this node.
+        return (
+            isinstance(child, SharedParentNode)
+            and child._html is None
+            and not child._shared
+        )
+
+    def _render_shared_below(self):
+        # Renders the uncached shared parents below this node bottom-up, so
+        # each one is cached before an ancestor reaches it and nesting never
+        # becomes recursion. The nodes in between are only walked.
+        seen = set()
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if (
+                    isinstance(child, SharedParentNode)
+                    and child._html is None
+                    and id(child) not in seen
+                ):
+                    seen.add(id(child))
+                    stack.append((child, iter(child.children)))
+                    break
+            else:
+                stack.pop()
+                if node is not self and node._shared:
+                    node._store_html("".join(ParentNode.iter_html(node)))
+
+    def _render(self):
+        self._render_shared_below()
+        self._store_html("".join(ParentNode.iter_html(self)))
+
+    def iter_html(self):
+        if self._html is not None or self._shared:
+            yield self.to_html()
+            return
+        self._render_shared_below()
+        yield from ParentNode.iter_html(self)
+
+
+class NodeTable:
+    # Hash-consing table: structurally identical nodes built through the
+    # same table are the same object. Children are keyed by identity, which
+    # is sound because they are themselves interned and kept alive by their
+    # parents. Entries disappear once no tree references them.
+    def __init__(self):
+        self._nodes = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.render_hits = 0
+        self.render_misses = 0
+
+    def _intern(self, key, make):
+        node = self._nodes.get(key)
+        if node is not None:
+            self.hits += 1
+            object.__setattr__(node, "_shared", True)
+            self.bytes_saved += sys.getsizeof(node) + sys.getsizeof(node.children)
+            if node.props is not None:
+                self.bytes_saved += sys.getsizeof(dict(node.props))
+            return node
+        self.misses += 1
+        node = make()
+        self._nodes[key] = node
+        return node
+
+    def leaf(self, tag, value, props=None, raw=False):
+        key = ("leaf", tag, value, _props_key(props), raw)
+        return self._intern(key, lambda: SharedLeafNode(tag, value, props, raw, self))
+
+    def parent(self, tag, children, props=None, raw=False):
+        children = tuple(children)
+        for child in children:
+            if not isinstance(child, _SharedNode) or child._table is not self:
+                raise TypeError("Shared parents need children from the same table")
+        key = ("parent", tag, tuple(map(id, children)), _props_key(props), raw)
+        return self._intern(
+            key, lambda: SharedParentNode(tag, children, props, raw, self)
+        )
+
+    def intern(self, node):
+        # Converts an ordinary node tree into shared nodes bottom-up, using
+        # an explicit stack so deep trees don't hit the recursion limit.
+        if isinstance(node, _SharedNode) and node._table is self:
+            return node
+        done = {}
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if id(current) in done:
+                continue
+            if isinstance(current, ParentNode):
+                if not expanded:
+                    stack.append((current, True))
+                    stack.extend((child, False) for child in current.children)
+                    continue
+                children = [done[id(child)] for child in current.children]
+                shared = self.parent(current.tag, children, current.props, current.raw)
+            elif isinstance(current, LeafNode):
+                shared = self.leaf(
+                    current.tag, current.value, current.props, current.raw
+                )
+            else:
+                raise TypeError(f"Cannot share {type(current).__name__}")
+            done[id(current)] = shared
+        return done[id(node)]
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        renders = self.render_hits + self.render_misses
+        return {
+            "nodes": len(self._nodes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "render_hits": self.render_hits,
+            "render_misses": self.render_misses,
+            "render_hit_rate": self.render_hits / renders if renders else 0.0,
+        }
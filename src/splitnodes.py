@@ -1,6 +1,20 @@
+import bisect
 import re
-from textnode import TextNode, TextType
-from mdextraction import extract_markdown_images, extract_markdown_links
+from htmlnode import escape_text
+from textnode import TextNode, TextType, render_textnodes
+from mdextraction import check_line_length
+
+# Bump whenever the nodes or inline HTML produced for a given input change,
+# so persisted caches of parser output are invalidated.
+PARSER_VERSION = 2
+
+
+def _child(node, text, text_type, url, start, end):
+    # Builds a node split out of node.text[start:end], carrying a source
+    # span when the parent has one.
+    if node.start is None:
+        return TextNode(text, text_type, url)
+    return TextNode(text, text_type, url, node.start + start, node.start + end)
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -15,18 +29,91 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         if len(parts) % 2 == 0:
             raise Exception("Markdown syntax error: missing closing delimiter")
 
+        pos = 0
+        width = len(delimiter)
         for i in range(len(parts)):
-            if parts[i] == "":
+            part = parts[i]
+            start = pos
+            pos += len(part) + width
+            if part == "":
                 continue
             if i % 2 == 0:
-                new_nodes.append(TextNode(parts[i], TextType.TEXT))
+                new_nodes.append(
+                    _child(node, part, TextType.TEXT, None, start, start + len(part))
+                )
             else:
-                new_nodes.append(TextNode(parts[i], text_type))
+                new_nodes.append(
+                    _child(node, part, text_type, None, start - width, pos)
+                )
 
     return new_nodes
 
 
-def split_nodes_helper(old_nodes, pattern, text_type, extract):
+class _BracketMatcher:
+    # Matches `[alt](url)` at a given "[" in text[:end] using the same rules
+    # as the split_nodes_image/split_nodes_link patterns; like the extract
+    # functions, a match never spans a newline. The positions of the next
+    # newline, "]" and ")" are cached, so a left-to-right sweep stays linear
+    # even on long runs of unmatched brackets.
+    def __init__(self, text, end):
+        self.text = text
+        self.end = end
+        self.line_end = -1
+        self.close = -1
+        self.paren = -1
+
+    def match(self, i):
+        text = self.text
+        end = self.end
+        if self.line_end < i:
+            self.line_end = text.find("\n", i, end)
+            if self.line_end == -1:
+                self.line_end = end
+        line_end = self.line_end
+        if self.close < i:
+            self.close = text.find("]", i, end)
+            if self.close == -1:
+                self.close = end
+        close = self.close
+        if close + 1 >= line_end or text[close + 1] != "(":
+            return None
+        if self.paren < close + 2:
+            self.paren = text.find(")", close + 2, end)
+            if self.paren == -1:
+                self.paren = end
+        if self.paren >= line_end:
+            return None
+        return self.paren + 1, i + 1, close, text[close + 2 : self.paren]
+
+
+# Links also match "![" so the sweep can step over images instead of
+# mistaking their "[" for the start of a link.
+_BRACKET_OPEN = {
+    TextType.IMAGE: re.compile(r"!\["),
+    TextType.LINK: re.compile(r"!?\["),
+}
+
+
+def _bracket_spans(text, start, end, text_type):
+    # Yields (start, end, alt_start, alt_end, url) for each image or link in
+    # text[start:end], found with a single left-to-right sweep.
+    search = _BRACKET_OPEN[text_type].search
+    brackets = _BracketMatcher(text, end)
+    pos = start
+    while match := search(text, pos, end):
+        begin, after = match.span()
+        pos = after
+        if text_type == TextType.LINK and after - begin == 2:
+            continue
+        found = brackets.match(after - 1)
+        if found is None:
+            continue
+        yield begin, *found
+        pos = found[0]
+
+
+def split_nodes_helper(old_nodes, text_type):
+    # Builds nodes straight from the offsets matched in each TEXT node.
     new_nodes = []
 
     for node in old_nodes:
@@ -34,37 +121,278 @@ def split_nodes_helper(old_nodes, pattern, text_type, extract):
             new_nodes.append(node)
             continue
 
-        parts = re.split(rf"({pattern})", node.text)
-
-        for part in parts:
-            if part == "":
-                continue
-            if re.fullmatch(pattern, part) and len(links := extract(part)) == 1:
-                ((text, link),) = links
-                new_nodes.append(TextNode(text, text_type, link))
-            else:
-                new_nodes.append(TextNode(part, TextType.TEXT))
+        text = node.text
+        check_line_length(text)
+        pending = 0
+        for start, end, alt_start, alt_end, url in _bracket_spans(
+            text, 0, len(text), text_type
+        ):
+            if pending < start:
+                new_nodes.append(
+                    _child(
+                        node, text[pending:start], TextType.TEXT, None, pending, start
+                    )
+                )
+            new_nodes.append(
+                _child(node, text[alt_start:alt_end], text_type, url, start, end)
+            )
+            pending = end
+        if pending < len(text):
+            new_nodes.append(
+                _child(node, text[pending:], TextType.TEXT, None, pending, len(text))
+            )
 
     return new_nodes
 
 
 def split_nodes_image(old_nodes):
-    return split_nodes_helper(
-        old_nodes, r"!\[[^\]]*]\([^)]*\)", TextType.IMAGE, extract_markdown_images
-    )
+    return split_nodes_helper(old_nodes, TextType.IMAGE)
 
 
 def split_nodes_link(old_nodes):
-    return split_nodes_helper(
-        old_nodes, r"(?<!!)\[[^\]]*]\([^)]*\)", TextType.LINK, extract_markdown_links
-    )
+    return split_nodes_helper(old_nodes, TextType.LINK)
 
 
-def text_to_textnodes(text):
-    node = [TextNode(text, TextType.TEXT)]
+def text_to_textnodes_passes(text):
+    node = [TextNode(text, TextType.TEXT, None, 0, len(text))]
     text_nodes = split_nodes_delimiter(node, "**", TextType.BOLD)
     text_nodes = split_nodes_delimiter(text_nodes, "_", TextType.ITALIC)
     text_nodes = split_nodes_delimiter(text_nodes, "`", TextType.CODE)
     text_nodes = split_nodes_image(text_nodes)
     text_nodes = split_nodes_link(text_nodes)
     return text_nodes
+
+
+_DELIMITER_TOKEN = re.compile(r"\*\*|_|`")
+
+_DELIMITERS = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+
+
+def _scan_links(text, start, end):
+    pending = start
+    for link_start, link_end, alt_start, alt_end, url in _bracket_spans(
+        text, start, end, TextType.LINK
+    ):
+        if pending < link_start:
+            yield TextType.TEXT, pending, link_start, None
+        yield TextType.LINK, alt_start, alt_end, url
+        pending = link_end
+    if pending < end:
+        yield TextType.TEXT, pending, end, None
+
+
+def _scan_brackets(text, start, end):
+    # Images take precedence, and links are only looked for between them,
+    # so "[![alt](src)](href)" is an image like with the passes engine.
+    if text.find("[", start, end) == -1:
+        if start < end:
+            yield TextType.TEXT, start, end, None
+        return
+    pending = start
+    for image_start, image_end, alt_start, alt_end, url in _bracket_spans(
+        text, start, end, TextType.IMAGE
+    ):
+        yield from _scan_links(text, pending, image_start)
+        yield TextType.IMAGE, alt_start, alt_end, url
+        pending = image_end
+    yield from _scan_links(text, pending, end)
+
+
+def scan_inline(text, start=0):
+    # Yields (text_type, start, end, url) spans, where text[start:end] is the
+    # node's text, in a single left-to-right pass over the input from start.
+    # Images and links never cross a delimiter, as the delimiter passes run
+    # first in the passes engine, and a delimiter closes at its next
+    # occurrence, so code spans keep any underscores in them.
+    check_line_length(text)
+    pos = start
+    while match := _DELIMITER_TOKEN.search(text, pos):
+        token = match.group()
+        begin, after = match.span()
+        close = text.find(token, after)
+        if close == -1:
+            raise Exception("Markdown syntax error: missing closing delimiter")
+        yield from _scan_brackets(text, pos, begin)
+        if after < close:
+            yield _DELIMITERS[token], after, close, None
+        pos = close + len(token)
+    yield from _scan_brackets(text, pos, len(text))
+
+
+# Width of the markup before and after a node's text. Links and images
+# also end with "(url)".
+_MARKUP_WIDTH = {
+    TextType.TEXT: (0, 0),
+    TextType.BOLD: (2, 2),
+    TextType.ITALIC: (1, 1),
+    TextType.CODE: (1, 1),
+    TextType.LINK: (1, 3),
+    TextType.IMAGE: (2, 3),
+}
+
+
+def _scan_node(text, text_type, start, end, url):
+    before, after = _MARKUP_WIDTH[text_type]
+    if url is not None:
+        after += len(url)
+    return TextNode(text[start:end], text_type, url, start - before, end + after)
+
+
+def text_to_textnodes_scan(text):
+    return [
+        _scan_node(text, text_type, start, end, url)
+        for text_type, start, end, url in scan_inline(text)
+    ]
+
+
+ENGINES = {
+    "scan": text_to_textnodes_scan,
+    "passes": text_to_textnodes_passes,
+}
+
+
+def text_to_textnodes(text, engine="scan"):
+    return _engine(engine)(text)
+
+
+# Any inline construct needs at least one of these characters, so strings
+# without them are plain text for every engine.
+_MARKUP_CHAR = re.compile(r"[*_`\[]")
+
+
+def _engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown inline engine: {engine}")
+    return ENGINES[engine]
+
+
+def _iter_textnodes_many(texts, parse):
+    has_markup = _MARKUP_CHAR.search
+    text_type = TextType.TEXT
+    for text in texts:
+        if has_markup(text):
+            yield parse(text)
+        elif text:
+            check_line_length(text)
+            yield [TextNode(text, text_type, None, 0, len(text))]
+        else:
+            yield []
+
+
+def text_to_textnodes_many(texts, engine="scan"):
+    # Lazily yields one node list per input string, in input order.
+    return _iter_textnodes_many(texts, _engine(engine))
+
+
+def _iter_html_many(texts, parse, raw):
+    has_markup = _MARKUP_CHAR.search
+    for text in texts:
+        if has_markup(text):
+            yield render_textnodes(parse(text), raw)
+        else:
+            check_line_length(text)
+            yield text if raw else escape_text(text)
+
+
+def text_to_html_many(texts, engine="scan", raw=False):
+    # Lazily yields the inline HTML for each input string, in input order.
+    return _iter_html_many(texts, _engine(engine), raw)
+
+
+def _node_start(node):
+    return node.start
+
+
+def _node_end(node):
+    return node.end
+
+
+def _restart_index(text, nodes, offset):
+    # Index of the first node that has to be parsed again: the first one
+    # reaching the edit, or an earlier plain-text node holding a "[" that the
+    # edit could turn into a link or image by supplying its "]" or "(...)".
+    # A "[" can only be affected if no "]" lies between it and the edit, or
+    # if its "](" has no ")" before the edit, which bounds how far back to
+    # look.
+    restart = bisect.bisect_left(nodes, offset, key=_node_end)
+    last_paren = text.rfind(")", 0, offset)
+    threshold = 1 + min(
+        text.rfind("]", 0, max(offset - 1, 0)),
+        text.rfind("]", 0, max(last_paren - 1, 0)),
+    )
+    bracket = text.find("[", threshold, offset)
+    if bracket != -1:
+        index = bisect.bisect_right(nodes, bracket, hi=restart, key=_node_end)
+        while index < restart:
+            node = nodes[index]
+            if node.text_type == TextType.TEXT:
+                found = text.find("[", max(node.start, threshold), node.end)
+            elif node.text_type == TextType.LINK:
+                # An image the edit completes inside the url would take
+                # precedence over the link.
+                found = text.find("![", max(node.start, threshold - 1), node.end)
+            else:
+                found = -1
+            if found != -1:
+                restart = index
+                break
+            index += 1
+    # Text parsed from the restart point may join the plain text before it.
+    if restart > 0 and nodes[restart - 1].text_type == TextType.TEXT:
+        restart -= 1
+    return restart
+
+
+def _resume_index(text, nodes, restart, pos):
+    # Index of the old node that parsing from pos would produce first, if
+    # pos is a point where the old parse started afresh (a node boundary).
+    index = bisect.bisect_left(nodes, pos, lo=restart, key=_node_start)
+    if index < len(nodes) and nodes[index].start == pos:
+        return index
+    if index > restart and nodes[index - 1].end == pos:
+        return index
+    if pos == len(text) and index == len(nodes):
+        return index
+    return None
+
+
+def reparse_textnodes(text, nodes, offset, removed, inserted):
+    # Applies an edit replacing text[offset:offset + removed] with inserted
+    # and returns (new_text, new_nodes), where nodes are the spanned nodes of
+    # text_to_textnodes(text). Nodes before the edit are reused; parsing
+    # restarts at the first affected node and stops at the first construct
+    # ending on an old node boundary past the edit, after which the old
+    # nodes are shifted into place.
+    if not 0 <= offset <= offset + removed <= len(text):
+        raise ValueError("Edit is outside the text")
+    new_text = text[:offset] + inserted + text[offset + removed :]
+    if not nodes or nodes[0].start is None:
+        return new_text, text_to_textnodes(new_text)
+
+    restart = _restart_index(text, nodes, offset)
+    start = nodes[restart - 1].end if restart else 0
+    edit_end = offset + len(inserted)
+    delta = len(inserted) - removed
+
+    new_nodes = nodes[:restart]
+    resume = None
+    for text_type, node_start, node_end, url in scan_inline(new_text, start):
+        node = _scan_node(new_text, text_type, node_start, node_end, url)
+        new_nodes.append(node)
+        if text_type != TextType.TEXT and node.end >= edit_end:
+            resume = _resume_index(text, nodes, restart, node.end - delta)
+            if resume is not None:
+                break
+    if resume is None:
+        return new_text, new_nodes
+    for node in nodes[resume:]:
+        if delta:
+            node = TextNode(
+                node.text,
+                node.text_type,
+                node.url,
+                node.start + delta,
+                node.end + delta,
+            )
+        new_nodes.append(node)
+    return new_text, new_nodes
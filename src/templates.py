@@ -0,0 +1,74 @@
+import os
+import re
+
+from htmlnode import HTMLNode, escape_text
+
+SLOT = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+def _encode_value(value):
+    # Strings are escaped like leaf text; bytes and nodes are already HTML.
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, HTMLNode):
+        return value.to_html().encode("utf-8")
+    return escape_text(str(value)).encode("utf-8")
+
+
+class Template:
+    # A template compiled once into static byte chunks with slots between
+    # them: chunks[0], slot 0, chunks[1], ..., chunks[-1]. Rendering only
+    # joins bytes; the template text is never scanned again.
+    def __init__(self, text):
+        parts = SLOT.split(text)
+        self.chunks = tuple(part.encode("utf-8") for part in parts[0::2])
+        self.slots = tuple(parts[1::2])
+        self.names = tuple(dict.fromkeys(self.slots))
+        self.indices = tuple(self.names.index(name) for name in self.slots)
+
+    def _values(self, values):
+        missing = [name for name in self.names if name not in values]
+        if missing:
+            raise ValueError(f"Missing template values: {', '.join(missing)}")
+        return [values[name] for name in self.names]
+
+    def iter_render(self, values):
+        # Streams the page; node values are rendered chunk by chunk.
+        values = self._values(values)
+        chunks = self.chunks
+        for i, index in enumerate(self.indices):
+            yield chunks[i]
+            value = values[index]
+            if isinstance(value, HTMLNode):
+                for chunk in value.iter_html():
+                    yield chunk.encode("utf-8")
+            else:
+                yield _encode_value(value)
+        yield chunks[-1]
+
+    def render(self, values):
+        encoded = [_encode_value(value) for value in self._values(values)]
+        chunks = self.chunks
+        parts = [chunks[0]]
+        for i, index in enumerate(self.indices, 1):
+            parts.append(encoded[index])
+            parts.append(chunks[i])
+        return b"".join(parts)
+
+
+_compiled = {}
+
+
+def load_template(path):
+    # Compiled templates are cached per process, keyed by path and
+    # revalidated against the file's mtime and size.
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _compiled.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, encoding="utf-8") as fp:
+        template = Template(fp.read())
+    _compiled[key] = (signature, template)
+    return template
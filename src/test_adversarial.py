@@ -0,0 +1,79 @@
+import time
+import unittest
+from unittest import mock
+
+import mdextraction
+from corpus import ADVERSARIAL
+from mdextraction import (
+    MarkdownLimitError,
+    extract_markdown_images,
+    extract_markdown_links,
+)
+from splitnodes import split_nodes_image, split_nodes_link, text_to_textnodes
+from textnode import TextNode, TextType
+
+SMALL = 4_000
+SCALE = 8
+
+FUNCTIONS = {
+    "extract_markdown_images": extract_markdown_images,
+    "extract_markdown_links": extract_markdown_links,
+    "split_nodes_image": lambda text: split_nodes_image(
+        [TextNode(text, TextType.TEXT)]
+    ),
+    "split_nodes_link": lambda text: split_nodes_link([TextNode(text, TextType.TEXT)]),
+    "text_to_textnodes": text_to_textnodes,
+}
+
+
+def best_time(func, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scaling(func, make_input):
+    small = best_time(func, make_input(SMALL))
+    large = best_time(func, make_input(SMALL * SCALE))
+    # Clamp tiny timings so timer noise can't dominate the ratio.
+    return max(large, 1e-4) / max(small, 1e-4 / SCALE)
+
+
+class TestAdversarialScaling(unittest.TestCase):
+    def test_near_linear(self):
+        # Quadratic behaviour shows up as a ~64x slowdown for 8x the input,
+        # linear as ~8x; the bound leaves room for noisy machines.
+        for input_name, make_input in ADVERSARIAL.items():
+            for func_name, func in FUNCTIONS.items():
+                with self.subTest(input=input_name, func=func_name):
+                    self.assertLess(scaling(func, make_input), SCALE * 4)
+
+
+class TestLineLimit(unittest.TestCase):
+    def test_long_line_rejected(self):
+        text = "[" * 200
+        with mock.patch.object(mdextraction, "MAX_LINE_LENGTH", 100):
+            for func_name, func in FUNCTIONS.items():
+                with self.subTest(func=func_name):
+                    with self.assertRaises(MarkdownLimitError):
+                        func(text)
+
+    def test_many_short_lines_allowed(self):
+        text = "\n".join(["[a](b)"] * 100)
+        with mock.patch.object(mdextraction, "MAX_LINE_LENGTH", 10):
+            self.assertEqual(100, len(extract_markdown_links(text)))
+
+    def test_error_message(self):
+        with mock.patch.object(mdextraction, "MAX_LINE_LENGTH", 10):
+            with self.assertRaisesRegex(MarkdownLimitError, "limit of 10"):
+                extract_markdown_images("x" * 11)
+
+    def test_limit_is_value_error(self):
+        self.assertTrue(issubclass(MarkdownLimitError, ValueError))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import errno
+import os
+import tempfile
+import unittest
+
+import assets
+from assets import ASSET_MANIFEST_NAME, AssetSync, sync_assets
+
+
+class TestSyncAssets(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.static = os.path.join(tmp.name, "static")
+        self.output = os.path.join(tmp.name, "public")
+        self.write("css/site.css", b"body {}")
+        self.write("img/logo.png", bytes(range(256)) * 100)
+
+    def write(self, name, data):
+        path = os.path.join(self.static, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fp:
+            fp.write(data)
+
+    def read(self, name):
+        with open(os.path.join(self.output, name), "rb") as fp:
+            return fp.read()
+
+    def test_first_sync_copies(self):
+        stats = sync_assets(self.static, self.output)
+        self.assertEqual(
+            (2, 0, 0), (stats["copied"], stats["unchanged"], stats["removed"])
+        )
+        self.assertEqual(7 + 25_600, stats["bytes_copied"])
+        self.assertEqual(b"body {}", self.read("css/site.css"))
+        self.assertEqual(bytes(range(256)) * 100, self.read("img/logo.png"))
+        self.assertEqual(
+            os.stat(os.path.join(self.static, "css/site.css")).st_mtime_ns,
+            os.stat(os.path.join(self.output, "css/site.css")).st_mtime_ns,
+        )
+
+    def test_resync_skips_unchanged(self):
+        sync_assets(self.static, self.output)
+        for check in ("mtime", "hash"):
+            with self.subTest(check=check):
+                stats = sync_assets(self.static, self.output, check)
+                self.assertEqual((0, 2), (stats["copied"], stats["unchanged"]))
+
+    def test_changed_asset_copied(self):
+        sync_assets(self.static, self.output)
+        self.write("css/site.css", b"p {}   ")
+        stats = sync_assets(self.static, self.output)
+        self.assertEqual((1, 1), (stats["copied"], stats["unchanged"]))
+        self.assertEqual(b"p {}   ", self.read("css/site.css"))
+
+    def test_hash_check_ignores_mtime(self):
+        sync_assets(self.static, self.output)
+        os.utime(os.path.join(self.static, "css/site.css"), (0, 0))
+        self.assertEqual(0, sync_assets(self.static, self.output, "hash")["copied"])
+        self.assertEqual(1, sync_assets(self.static, self.output, "mtime")["copied"])
+
+    def test_stale_outputs_removed(self):
+        sync_assets(self.static, self.output)
+        os.remove(os.path.join(self.static, "img/logo.png"))
+        stats = sync_assets(self.static, self.output)
+        self.assertEqual(1, stats["removed"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "img/logo.png")))
+        self.assertTrue(os.path.exists(os.path.join(self.output, ASSET_MANIFEST_NAME)))
+
+    def test_hardlink(self):
+        stats = sync_assets(self.static, self.output, link=True)
+        self.assertEqual({"hardlink": 2}, stats["methods"])
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.static, "css/site.css"),
+                os.path.join(self.output, "css/site.css"),
+            )
+        )
+
+    def test_falls_back_when_unsupported(self):
+        def unsupported(source, destination, size):
+            raise OSError(errno.EXDEV, "cross-device")
+
+        sync = AssetSync(self.static, self.output, workers=1)
+        sync.methods = [("fast", unsupported), ("copy", assets._copy)]
+        stats = sync.run()
+        self.assertEqual({"copy": 2}, stats["methods"])
+        self.assertEqual([("copy", assets._copy)], sync.methods)
+
+    def test_real_errors_raise(self):
+        def failing(source, destination, size):
+            raise OSError(errno.ENOSPC, "disk full")
+
+        sync = AssetSync(self.static, self.output)
+        sync.methods = [("fast", failing), ("copy", assets._copy)]
+        with self.assertRaises(OSError):
+            sync.run()
+        leftovers = [
+            name
+            for _, _, files in os.walk(self.output)
+            for name in files
+            if name.endswith(".tmp")
+        ]
+        self.assertEqual([], leftovers)
+
+    def test_each_copy_method(self):
+        for name, method, available in assets.COPY_METHODS:
+            if not available:
+                continue
+            with self.subTest(method=name):
+                self.output = os.path.join(os.path.dirname(self.static), name)
+                sync = AssetSync(self.static, self.output)
+                sync.methods = [(name, method), ("copy", assets._copy)]
+                sync.run()
+                self.assertEqual(bytes(range(256)) * 100, self.read("img/logo.png"))
+
+    def test_invalid_check(self):
+        with self.assertRaises(ValueError):
+            sync_assets(self.static, self.output, check="size")
+
+    def test_missing_static_dir(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_assets(os.path.join(self.static, "nope"), self.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from atomicwrite import atomic_write, temp_path
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.path = os.path.join(tmp.name, "page.html")
+
+    def test_writes_and_replaces(self):
+        atomic_write(self.path, b"old")
+        atomic_write(self.path, b"new")
+        with open(self.path, "rb") as fp:
+            self.assertEqual(b"new", fp.read())
+        self.assertEqual(["page.html"], os.listdir(self.dir))
+
+    def test_temp_paths_unique(self):
+        paths = {temp_path(self.path) for _ in range(100)}
+        self.assertEqual(100, len(paths))
+        for path in paths:
+            self.assertEqual(self.dir, os.path.dirname(path))
+
+    def test_failure_leaves_old_file(self):
+        atomic_write(self.path, b"old")
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                atomic_write(self.path, b"new")
+        with open(self.path, "rb") as fp:
+            self.assertEqual(b"old", fp.read())
+        self.assertEqual(["page.html"], os.listdir(self.dir))
+
+    def test_honours_umask(self):
+        old = os.umask(0o022)
+        try:
+            atomic_write(self.path, b"data")
+        finally:
+            os.umask(old)
+        self.assertEqual(0o644, os.stat(self.path).st_mode & 0o777)
+
+
+if __name__ == "__main__":
+    unittest.main()
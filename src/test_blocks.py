@@ -0,0 +1,132 @@
+import io
+import os
+import tempfile
+import unittest
+
+from blocks import (
+    BlockType,
+    block_to_block_type,
+    iter_blocks,
+    iter_file_blocks,
+    markdown_to_html_node,
+    write_markdown_file,
+)
+
+MARKDOWN = """# The **title**
+
+First paragraph with _italic_
+continued on a second line.
+
+```python
+def f(x):
+
+    return x < 1
+```
+
+> A quote with `code`
+> over two lines
+
+- one
+- [two](https://example.com)
+
+1. first
+2. second
+"""
+
+HTML = (
+    "<div><h1>The <b>title</b></h1>"
+    "<p>First paragraph with <i>italic</i> continued on a second line.</p>"
+    "<pre><code>def f(x):\n\n    return x &lt; 1\n</code></pre>"
+    "<blockquote>A quote with <code>code</code> over two lines</blockquote>"
+    '<ul><li>one</li><li><a href="https://example.com">two</a></li></ul>'
+    "<ol><li>first</li><li>second</li></ol></div>"
+)
+
+
+class TestBlocks(unittest.TestCase):
+    def test_iter_blocks(self):
+        blocks = list(iter_blocks(MARKDOWN.splitlines()))
+        self.assertEqual(6, len(blocks))
+        self.assertEqual("```python\ndef f(x):\n\n    return x < 1\n```", blocks[2])
+
+    def test_blank_lines_with_whitespace(self):
+        self.assertEqual(["a", "b"], list(iter_blocks(["a", "   ", "", "b", "\t"])))
+
+    def test_fence_closes_paragraph(self):
+        blocks = list(iter_blocks(["text", "```", "code", "```", "after"]))
+        self.assertEqual(["text", "```\ncode\n```", "after"], blocks)
+
+    def test_single_line_fence(self):
+        self.assertEqual(["```x```", "y"], list(iter_blocks(["```x```", "y"])))
+
+    def test_block_types(self):
+        cases = [
+            ("# heading", BlockType.HEADING),
+            ("###### heading", BlockType.HEADING),
+            ("####### too deep", BlockType.PARAGRAPH),
+            ("#no space", BlockType.PARAGRAPH),
+            ("```\ncode\n```", BlockType.CODE),
+            ("> a\n> b", BlockType.QUOTE),
+            ("> a\nb", BlockType.PARAGRAPH),
+            ("- a\n* b", BlockType.UNORDERED_LIST),
+            ("1. a\n2. b", BlockType.ORDERED_LIST),
+            ("1. a\n3. b", BlockType.PARAGRAPH),
+            ("**bold** start", BlockType.PARAGRAPH),
+        ]
+        for block, block_type in cases:
+            with self.subTest(block=block):
+                self.assertEqual(block_type, block_to_block_type(block))
+
+    def test_markdown_to_html_node(self):
+        self.assertEqual(HTML, markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_empty(self):
+        self.assertEqual("<div></div>", markdown_to_html_node("\n\n").to_html())
+
+
+class TestFileStreaming(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "page.md")
+
+    def write(self, text):
+        with open(self.path, "w", encoding="utf-8") as fp:
+            fp.write(text)
+
+    def test_file_blocks_match_text(self):
+        self.write(MARKDOWN + "\nCafé ☃\n")
+        self.assertEqual(
+            list(iter_blocks((MARKDOWN + "\nCafé ☃\n").splitlines())),
+            list(iter_file_blocks(self.path)),
+        )
+
+    def test_file_and_text_split_lines_alike(self):
+        markdown = "a\rb\n\nc\u2028d\r\n\ne\x0cf"
+        with open(self.path, "wb") as fp:
+            fp.write(markdown.encode("utf-8"))
+        text = io.StringIO()
+        write_markdown_file(self.path, text)
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), text.getvalue())
+
+    def test_empty_file(self):
+        self.write("")
+        self.assertEqual([], list(iter_file_blocks(self.path)))
+
+    def test_write_markdown_file(self):
+        self.write(MARKDOWN)
+        text = io.StringIO()
+        write_markdown_file(self.path, text)
+        self.assertEqual(HTML, text.getvalue())
+        binary = io.BytesIO()
+        write_markdown_file(self.path, binary)
+        self.assertEqual(HTML.encode("utf-8"), binary.getvalue())
+
+    def test_blocks_are_lazy(self):
+        self.write("a\n\n**unclosed\n")
+        blocks = iter_file_blocks(self.path)
+        self.assertEqual("a", next(blocks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,303 @@
+import contextlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from build import BUILD_VERSION, MANIFEST_NAME, build_site
+
+
+class TestBuildSite(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.content = os.path.join(tmp.name, "content")
+        self.output = os.path.join(tmp.name, "public")
+        self.write("index.md", "Hello **world**")
+        self.write("blog/post.md", "A _post_")
+
+    def write(self, name, text):
+        path = os.path.join(self.content, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fp:
+            fp.write(text)
+
+    def read(self, name):
+        with open(os.path.join(self.output, name)) as fp:
+            return fp.read()
+
+    def test_first_build(self):
+        stats = build_site(self.content, self.output)
+        self.assertEqual(
+            (2, 0, 0), (stats["built"], stats["skipped"], stats["removed"])
+        )
+        self.assertEqual(
+            "<div><p>Hello <b>world</b></p></div>", self.read("index.html")
+        )
+        self.assertEqual("<div><p>A <i>post</i></p></div>", self.read("blog/post.html"))
+
+    def test_noop_rebuild_skips(self):
+        build_site(self.content, self.output)
+        stats = build_site(self.content, self.output)
+        self.assertEqual((0, 2), (stats["built"], stats["skipped"]))
+
+    def test_identical_output_not_rewritten(self):
+        build_site(self.content, self.output)
+        page = os.path.join(self.output, "index.html")
+        os.utime(page, (1_000_000, 1_000_000))
+        os.remove(os.path.join(self.output, MANIFEST_NAME))
+        stats = build_site(self.content, self.output)
+        self.assertEqual(
+            (2, 0, 2), (stats["built"], stats["written"], stats["unchanged"])
+        )
+        self.assertEqual(1_000_000, os.stat(page).st_mtime)
+        self.assertEqual(
+            os.path.getsize(page) + len(self.read("blog/post.html")),
+            stats["bytes_saved"],
+        )
+
+    def test_reformatted_source_keeps_output(self):
+        build_site(self.content, self.output)
+        self.write("index.md", "Hello **world**\n\n")
+        stats = build_site(self.content, self.output)
+        self.assertEqual(
+            (1, 0, 1), (stats["built"], stats["written"], stats["unchanged"])
+        )
+
+    def test_changed_output_replaced_atomically(self):
+        build_site(self.content, self.output)
+        self.write("index.md", "Hello _again_")
+        stats = build_site(self.content, self.output)
+        self.assertEqual((1, 0), (stats["written"], stats["unchanged"]))
+        self.assertEqual(
+            ["index.html"],
+            [name for name in os.listdir(self.output) if name.startswith("index")],
+        )
+
+    def test_changed_source_rebuilt(self):
+        build_site(self.content, self.output)
+        self.write("index.md", "Hello _again_")
+        stats = build_site(self.content, self.output)
+        self.assertEqual((1, 1), (stats["built"], stats["skipped"]))
+        self.assertEqual(
+            "<div><p>Hello <i>again</i></p></div>", self.read("index.html")
+        )
+
+    def test_missing_output_rebuilt(self):
+        build_site(self.content, self.output)
+        os.remove(os.path.join(self.output, "index.html"))
+        stats = build_site(self.content, self.output)
+        self.assertEqual((1, 1), (stats["built"], stats["skipped"]))
+
+    def test_removed_source_deletes_output(self):
+        build_site(self.content, self.output)
+        os.remove(os.path.join(self.content, "blog/post.md"))
+        stats = build_site(self.content, self.output)
+        self.assertEqual(1, stats["removed"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog/post.html")))
+
+    def test_removed_source_deletes_output_when_options_change(self):
+        template = os.path.join(os.path.dirname(self.output), "page.html")
+        with open(template, "w") as fp:
+            fp.write("<body>{{ content }}</body>")
+        build_site(self.content, self.output, template_path=template)
+        os.remove(os.path.join(self.content, "blog/post.md"))
+        with open(template, "w") as fp:
+            fp.write("<main>{{ content }}</main>")
+        stats = build_site(self.content, self.output, template_path=template)
+        self.assertEqual((1, 1), (stats["built"], stats["removed"]))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog/post.html")))
+        os.remove(os.path.join(self.content, "index.md"))
+        with open(os.path.join(self.output, MANIFEST_NAME)) as fp:
+            manifest = json.load(fp)
+        manifest["version"] = BUILD_VERSION - 1
+        with open(os.path.join(self.output, MANIFEST_NAME), "w") as fp:
+            json.dump(manifest, fp)
+        stats = build_site(self.content, self.output)
+        self.assertEqual(1, stats["removed"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.html")))
+
+    def test_manifest_records_digests(self):
+        build_site(self.content, self.output)
+        with open(os.path.join(self.output, MANIFEST_NAME)) as fp:
+            manifest = json.load(fp)
+        self.assertEqual(BUILD_VERSION, manifest["version"])
+        self.assertEqual({"blog/post.md", "index.md"}, set(manifest["pages"]))
+        self.assertEqual(
+            {"source", "output", "size"}, set(manifest["pages"]["index.md"])
+        )
+
+    def test_corrupt_manifest_rebuilds(self):
+        build_site(self.content, self.output)
+        with open(os.path.join(self.output, MANIFEST_NAME), "w") as fp:
+            fp.write("{not json")
+        stats = build_site(self.content, self.output)
+        self.assertEqual(2, stats["built"])
+
+    def test_parallel_build_matches_serial(self):
+        for i in range(20):
+            self.write(f"pages/{i}.md", f"Page {i} with `code` and ![img](/{i}.png)")
+        serial = os.path.join(os.path.dirname(self.output), "serial")
+        build_site(self.content, serial)
+        stats = build_site(self.content, self.output, jobs=2)
+        self.assertEqual(22, stats["built"])
+        self.assertEqual(22, sum(w["pages"] for w in stats["workers"].values()))
+        for name in ["index.html", "blog/post.html", "pages/7.html"]:
+            with open(os.path.join(serial, name), "rb") as fp:
+                expected = fp.read()
+            with open(os.path.join(self.output, name), "rb") as fp:
+                self.assertEqual(expected, fp.read())
+
+    def test_pipelined_build_matches_serial(self):
+        for i in range(20):
+            self.write(f"pages/{i}.md", f"Page {i} with `code` and [link](/{i})")
+        serial = os.path.join(os.path.dirname(self.output), "serial")
+        build_site(self.content, serial)
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                shutil.rmtree(self.output, ignore_errors=True)
+                stats = build_site(self.content, self.output, jobs=jobs, io=4)
+                self.assertEqual(22, stats["built"])
+                for name in ["index.html", "blog/post.html", "pages/7.html"]:
+                    with open(os.path.join(serial, name)) as fp:
+                        self.assertEqual(fp.read(), self.read(name))
+
+    def test_pipelined_rebuild_skips(self):
+        build_site(self.content, self.output, io=4)
+        self.write("index.md", "Hello _again_")
+        stats = build_site(self.content, self.output, io=4)
+        self.assertEqual((1, 1), (stats["built"], stats["skipped"]))
+        self.assertEqual(1, stats["written"])
+        self.assertEqual(
+            "<div><p>Hello <i>again</i></p></div>", self.read("index.html")
+        )
+
+    def test_image_sizes(self):
+        static = os.path.join(os.path.dirname(self.output), "static")
+        os.makedirs(static)
+        with open(os.path.join(static, "a.gif"), "wb") as fp:
+            fp.write(b"GIF89a\x20\x00\x10\x00" + bytes(16))
+        self.write("index.md", "![a](/a.gif) ![b](https://example.com/b.gif)")
+        build_site(self.content, self.output)
+        stats = build_site(self.content, self.output, image_root=static)
+        self.assertEqual(2, stats["built"])
+        self.assertEqual(
+            '<div><p><img src="/a.gif" alt="a" width="32" height="16"></img> '
+            '<img src="https://example.com/b.gif" alt="b"></img></p></div>',
+            self.read("index.html"),
+        )
+        expected = self.read("index.html")
+        stats = build_site(self.content, self.output, image_root=static)
+        self.assertEqual(2, stats["skipped"])
+        parallel = os.path.join(os.path.dirname(self.output), "parallel")
+        build_site(self.content, parallel, jobs=2, image_root=static)
+        with open(os.path.join(parallel, "index.html")) as fp:
+            self.assertEqual(expected, fp.read())
+        self.assertEqual(2, build_site(self.content, self.output)["built"])
+
+    def test_changed_image_rebuilds_pages(self):
+        static = os.path.join(os.path.dirname(self.output), "static")
+        os.makedirs(os.path.join(static, "blog", "img"))
+
+        def gif(name, width, height):
+            with open(os.path.join(static, name), "wb") as fp:
+                fp.write(b"GIF89a" + struct.pack("<HH", width, height) + bytes(16))
+
+        gif("x.gif", 10, 20)
+        gif("blog/img/a.gif", 3, 4)
+        self.write("index.md", "![x](/x.gif)")
+        self.write("blog/post.md", "![a](img/a.gif) ![b](img/b.gif)")
+        for kwargs in [{}, {"io": 2}, {"jobs": 2}]:
+            with self.subTest(kwargs=kwargs):
+                shutil.rmtree(self.output, ignore_errors=True)
+                gif("x.gif", 10, 20)
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(static, "blog", "img", "b.gif"))
+                build_site(self.content, self.output, image_root=static, **kwargs)
+                self.assertIn('width="10" height="20"', self.read("index.html"))
+                self.assertEqual(
+                    '<div><p><img src="img/a.gif" alt="a" width="3" height="4">'
+                    '</img> <img src="img/b.gif" alt="b"></img></p></div>',
+                    self.read("blog/post.html"),
+                )
+
+                gif("x.gif", 300, 400)
+                stats = build_site(
+                    self.content, self.output, image_root=static, **kwargs
+                )
+                self.assertEqual((1, 1), (stats["built"], stats["skipped"]))
+                self.assertIn('width="300" height="400"', self.read("index.html"))
+
+                # A missing image that appears later rebuilds its page too.
+                gif("blog/img/b.gif", 5, 6)
+                stats = build_site(
+                    self.content, self.output, image_root=static, **kwargs
+                )
+                self.assertEqual((1, 1), (stats["built"], stats["skipped"]))
+                self.assertIn('width="5" height="6"', self.read("blog/post.html"))
+
+    def test_image_sizes_need_uncached_inline(self):
+        with self.assertRaises(ValueError):
+            build_site(self.content, self.output, cache_path="x", image_root="y")
+
+    def test_inline_cache_warm_build(self):
+        cache_path = os.path.join(os.path.dirname(self.output), "inline.bin")
+        build_site(self.content, self.output, cache_path=cache_path)
+        expected = self.read("index.html")
+        os.remove(os.path.join(self.output, MANIFEST_NAME))
+        stats = build_site(self.content, self.output, cache_path=cache_path)
+        self.assertEqual(2, stats["cache"]["hits"])
+        self.assertEqual(0, stats["cache"]["misses"])
+        self.assertEqual(expected, self.read("index.html"))
+
+    def test_template(self):
+        template = os.path.join(os.path.dirname(self.output), "page.html")
+        with open(template, "w") as fp:
+            fp.write("<title>{{ title }}</title><body>{{ content }}</body>")
+        self.write("index.md", "# Home & away\n\nHello")
+        build_site(self.content, self.output)
+        stats = build_site(self.content, self.output, template_path=template)
+        self.assertEqual(2, stats["built"])
+        expected = (
+            "<title>Home &amp; away</title><body><div><h1>Home &amp; away</h1>"
+            "<p>Hello</p></div></body>"
+        )
+        self.assertEqual(expected, self.read("index.html"))
+        self.assertTrue(self.read("blog/post.html").startswith("<title></title>"))
+        stats = build_site(self.content, self.output, template_path=template)
+        self.assertEqual(2, stats["skipped"])
+        for name, kwargs in [("parallel", {"jobs": 2}), ("pipelined", {"io": 2})]:
+            path = os.path.join(os.path.dirname(self.output), name)
+            build_site(self.content, path, template_path=template, **kwargs)
+            with open(os.path.join(path, "index.html")) as fp:
+                self.assertEqual(expected, fp.read())
+        with open(template, "w") as fp:
+            fp.write("<main>{{ content }}</main>")
+        stats = build_site(self.content, self.output, template_path=template)
+        self.assertEqual(2, stats["built"])
+
+    def test_template_title(self):
+        template = os.path.join(os.path.dirname(self.output), "page.html")
+        with open(template, "w") as fp:
+            fp.write("<title>{{ title }}</title>")
+        cases = [
+            ("```\n# install deps\n```\n\n# Real", "Real"),
+            ("# **Bold** _and_ `code` [link](/x)", "Bold and code link"),
+            ("## Sub\n\n# Top\nline", "Top line"),
+            ("No heading", ""),
+        ]
+        for markdown, title in cases:
+            with self.subTest(markdown=markdown):
+                self.write("index.md", markdown)
+                build_site(self.content, self.output, template_path=template)
+                self.assertEqual(f"<title>{title}</title>", self.read("index.html"))
+
+    def test_missing_content_dir(self):
+        with self.assertRaises(FileNotFoundError):
+            build_site(os.path.join(self.content, "nope"), self.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
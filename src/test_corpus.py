@@ -0,0 +1,34 @@
+import unittest
+
+from corpus import generate_corpus, generate_markdown, generate_tree
+from splitnodes import text_to_textnodes
+from textnode import TextType
+
+
+class TestCorpus(unittest.TestCase):
+    def test_reproducible(self):
+        self.assertEqual(generate_corpus(20, seed=3), generate_corpus(20, seed=3))
+        self.assertNotEqual(generate_corpus(20, seed=3), generate_corpus(20, seed=4))
+
+    def test_size(self):
+        corpus = generate_corpus(10, words=25)
+        self.assertEqual(10, len(corpus))
+        self.assertTrue(all(len(text.split()) >= 25 for text in corpus))
+
+    def test_density(self):
+        plain = generate_corpus(5, density=0)
+        self.assertTrue(all(len(text_to_textnodes(text)) == 1 for text in plain))
+        dense = generate_corpus(5, density=1)
+        types = {node.text_type for text in dense for node in text_to_textnodes(text)}
+        self.assertEqual(set(TextType), types)
+
+    def test_markdown_paragraphs(self):
+        self.assertEqual(4, len(generate_markdown(4).split("\n\n")))
+
+    def test_tree_depth(self):
+        html = generate_tree(depth=50, breadth=1).to_html()
+        self.assertEqual(50, html.count("<div"))
+
+
+if __name__ == "__main__":
+    unittest.main()
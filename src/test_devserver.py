@@ -0,0 +1,105 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from devserver import DevSite, InotifyWatcher, make_server
+
+
+class TestDevSite(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.content = os.path.join(tmp.name, "content")
+        self.static = os.path.join(tmp.name, "static")
+        os.makedirs(self.static)
+        with open(os.path.join(self.static, "site.css"), "w") as fp:
+            fp.write("body {}")
+        self.write("index.md", "Hello **world**")
+        self.write("blog/post.md", "A _post_")
+        self.reports = []
+        self.site = DevSite(self.content, self.static, self.reports.append)
+        self.site.refresh()
+
+    def write(self, name, text, mtime=None):
+        path = os.path.join(self.content, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fp:
+            fp.write(text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    def page(self, url):
+        return self.site.resolve(url)[1].decode()
+
+    def test_initial_render(self):
+        self.assertEqual("<div><p>Hello <b>world</b></p></div>", self.page("/"))
+        self.assertEqual("<div><p>A <i>post</i></p></div>", self.page("/blog/post"))
+
+    def test_only_changed_pages_rerendered(self):
+        self.write("blog/post.md", "A _new_ post", mtime=10**18)
+        stats = self.site.refresh()
+        self.assertEqual((1, 0), (stats["rendered"], stats["removed"]))
+        self.assertEqual("<div><p>A <i>new</i> post</p></div>", self.page("/blog/post"))
+        self.assertEqual(0, self.site.refresh()["rendered"])
+
+    def test_refresh_given_sources(self):
+        self.write("index.md", "Changed", mtime=10**18)
+        self.write("blog/post.md", "Also changed", mtime=10**18)
+        stats = self.site.refresh({"index.md"})
+        self.assertEqual(1, stats["rendered"])
+        self.assertEqual("<div><p>A <i>post</i></p></div>", self.page("/blog/post"))
+
+    def test_removed_page(self):
+        os.remove(os.path.join(self.content, "blog/post.md"))
+        self.assertEqual(1, self.site.refresh()["removed"])
+        self.assertIsNone(self.site.resolve("/blog/post.html"))
+
+    def test_broken_edit_keeps_last_page(self):
+        self.write("index.md", "Hello **world", mtime=10**18)
+        self.site.refresh()
+        self.assertEqual("<div><p>Hello <b>world</b></p></div>", self.page("/"))
+        self.assertEqual(1, len(self.reports))
+        self.assertTrue(self.reports[0].startswith("Error rendering index.md: "))
+
+    def test_resolve(self):
+        for url in ["/index.html", "/?v=1", "/blog/post.html", "//blog/post"]:
+            with self.subTest(url=url):
+                self.assertIsNotNone(self.site.resolve(url))
+        self.assertEqual(("text/css", b"body {}"), self.site.resolve("/site.css"))
+        self.assertIsNone(self.site.resolve("/missing"))
+        self.assertIsNone(self.site.resolve("/../content/index.md"))
+
+    def test_http(self):
+        server = make_server(self.site, port=0)
+        self.addCleanup(server.server_close)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.shutdown)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(base + "/blog/post") as response:
+            self.assertEqual(b"<div><p>A <i>post</i></p></div>", response.read())
+            self.assertEqual(
+                "text/html; charset=utf-8", response.headers["Content-Type"]
+            )
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(base + "/nope")
+
+    def test_inotify_watcher(self):
+        watcher = InotifyWatcher.create(self.content)
+        if watcher is None:
+            self.skipTest("inotify is not available")
+        self.addCleanup(watcher.close)
+        self.assertEqual(set(), watcher.wait(0))
+        self.write("blog/post.md", "Edited")
+        self.assertEqual({os.path.join("blog", "post.md")}, watcher.wait(1))
+        os.makedirs(os.path.join(self.content, "new"))
+        self.assertIsNone(watcher.wait(1))
+        self.write("new/page.md", "New")
+        self.assertEqual({os.path.join("new", "page.md")}, watcher.wait(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
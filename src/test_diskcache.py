@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import diskcache
+from diskcache import InlineDiskCache
+from splitnodes import text_to_textnodes
+from textnode import render_textnodes
+
+TEXT = "Some **bold** and a [link](https://example.com?a&b)"
+
+
+class TestInlineDiskCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "cache", "inline.bin")
+
+    def test_miss_then_hit(self):
+        cache = InlineDiskCache(self.path)
+        self.assertListEqual(text_to_textnodes(TEXT), cache.text_to_textnodes(TEXT))
+        self.assertListEqual(text_to_textnodes(TEXT), cache.text_to_textnodes(TEXT))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_hit_keeps_spans(self):
+        cache = InlineDiskCache(self.path)
+        miss = cache.text_to_textnodes(TEXT)
+        hit = cache.text_to_textnodes(TEXT)
+        self.assertEqual(
+            [(n.start, n.end) for n in text_to_textnodes(TEXT)],
+            [(n.start, n.end) for n in miss],
+        )
+        self.assertEqual(
+            [(n.start, n.end) for n in miss], [(n.start, n.end) for n in hit]
+        )
+
+    def test_persists_across_instances(self):
+        with InlineDiskCache(self.path) as cache:
+            cache.text_to_textnodes(TEXT)
+            cache.text_to_html(TEXT)
+        cache = InlineDiskCache(self.path)
+        self.assertEqual(2, len(cache))
+        self.assertListEqual(text_to_textnodes(TEXT), cache.text_to_textnodes(TEXT))
+        self.assertEqual(
+            render_textnodes(text_to_textnodes(TEXT)), cache.text_to_html(TEXT)
+        )
+        self.assertEqual((2, 0), (cache.hits, cache.misses))
+
+    def test_save_without_changes_skips_write(self):
+        InlineDiskCache(self.path).save()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_corrupted_file_ignored(self):
+        with InlineDiskCache(self.path) as cache:
+            cache.text_to_html(TEXT)
+        with open(self.path, "r+b") as fp:
+            fp.seek(20)
+            fp.write(b"garbage")
+        cache = InlineDiskCache(self.path)
+        self.assertEqual(0, len(cache))
+        self.assertEqual(
+            render_textnodes(text_to_textnodes(TEXT)), cache.text_to_html(TEXT)
+        )
+
+    def test_truncated_and_foreign_files_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        for data in [b"", b"SSGC", b"not a cache file at all"]:
+            with open(self.path, "wb") as fp:
+                fp.write(data)
+            self.assertEqual(0, len(InlineDiskCache(self.path)))
+
+    def test_parser_version_invalidates(self):
+        with InlineDiskCache(self.path) as cache:
+            cache.text_to_html(TEXT)
+        stamp = (diskcache.FORMAT_VERSION, -1, diskcache.STAMP[2])
+        with mock.patch.object(diskcache, "STAMP", stamp):
+            self.assertEqual(0, len(InlineDiskCache(self.path)))
+
+    def test_size_bounded_eviction(self):
+        with InlineDiskCache(self.path, max_bytes=2000) as cache:
+            for i in range(100):
+                cache.text_to_html(f"paragraph {i} with **bold**")
+            self.assertLessEqual(cache.size, 2000)
+            self.assertGreater(cache.evictions, 0)
+        reloaded = InlineDiskCache(self.path, max_bytes=2000)
+        self.assertEqual(len(cache), len(reloaded))
+        reloaded.text_to_html("paragraph 99 with **bold**")
+        self.assertEqual(1, reloaded.hits)
+
+    def test_no_temp_files_left(self):
+        with InlineDiskCache(self.path) as cache:
+            cache.text_to_html(TEXT)
+        self.assertEqual(["inline.bin"], os.listdir(os.path.dirname(self.path)))
+
+    def test_errors_not_cached(self):
+        cache = InlineDiskCache(self.path)
+        with self.assertRaises(Exception):
+            cache.text_to_html("**unclosed")
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
+import gzip
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_attribute, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -80,6 +82,10 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("p", "Hello, world!")
         self.assertEqual("(tag=p, value=Hello, world!, props=None)", repr(node))
 
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(LeafNode("p", "text"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", []), "__dict__"))
+
 
 class TestParentNode(unittest.TestCase):
     def test_to_html_tag_exception(self):
@@ -153,6 +159,96 @@ class TestParentNode(unittest.TestCase):
             '<div id="root" lang="en"><section class="container" data-role="page-section"><h1 class="title" id="main-title">Welcome</h1><p class="body-text" data-theme="dark">Some intro text.</p></section><footer class="site-footer" style="color: gray;">Footer content</footer></div>',
         )
 
+    def test_to_html_deep_nesting(self):
+        depth = 50_000
+        node = LeafNode("b", "deep")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertEqual("<div>" * depth + "<b>deep</b>" + "</div>" * depth, html)
+
+    def test_to_html_nested_child_exception(self):
+        node = ParentNode("div", [ParentNode("p", [ParentNode("span", None)])])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual("a &lt;b&gt; &amp; c", escape_text("a <b> & c"))
+        self.assertEqual('say "hi"', escape_text('say "hi"'))
+
+    def test_escape_attribute(self):
+        self.assertEqual("a &quot;b&quot; &amp;&lt;&gt;", escape_attribute('a "b" &<>'))
+
+    def test_clean_strings_not_copied(self):
+        text = "".join(["clean", " text"])
+        self.assertIs(text, escape_text(text))
+        self.assertIs(text, escape_attribute(text))
+
+    def test_leaf_value_escaped(self):
+        node = LeafNode("p", "1 < 2 & 3 > 2")
+        self.assertEqual("<p>1 &lt; 2 &amp; 3 &gt; 2</p>", node.to_html())
+        self.assertEqual("x &lt; y", LeafNode(None, "x < y").to_html())
+
+    def test_props_escaped(self):
+        node = LeafNode("a", "link", {"href": 'https://ex.com/?a=1&b="2"'})
+        self.assertEqual(
+            '<a href="https://ex.com/?a=1&amp;b=&quot;2&quot;">link</a>', node.to_html()
+        )
+        parent = ParentNode("div", [], {"title": "<x>"})
+        self.assertEqual('<div title="&lt;x&gt;"></div>', parent.to_html())
+
+    def test_raw_opt_out(self):
+        node = LeafNode(None, "<em>trusted</em>", raw=True)
+        self.assertEqual("<em>trusted</em>", node.to_html())
+        node = LeafNode("a", "<b>x</b>", {"href": "?a&b"}, raw=True)
+        self.assertEqual('<a href="?a&b"><b>x</b></a>', node.to_html())
+        parent = ParentNode("div", [LeafNode(None, "<br>")], {"data-x": "&"}, raw=True)
+        self.assertEqual('<div data-x="&">&lt;br&gt;</div>', parent.to_html())
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                LeafNode("a", "link", {"href": "https://example.com"}),
+            ],
+            {"id": "root"},
+        )
+
+    def test_iter_html_matches_to_html(self):
+        self.assertEqual(self.node.to_html(), "".join(self.node.iter_html()))
+
+    def test_iter_html_leaf(self):
+        self.assertEqual(["<p>hi</p>"], list(LeafNode("p", "hi").iter_html()))
+
+    def test_iter_html_exception(self):
+        node = ParentNode("div", [ParentNode(None, [LeafNode("b", "x")])])
+        with self.assertRaises(ValueError):
+            list(node.iter_html())
+
+    def test_write_html_text(self):
+        fp = io.StringIO()
+        self.node.write_html(fp)
+        self.assertEqual(self.node.to_html(), fp.getvalue())
+
+    def test_write_html_binary(self):
+        node = ParentNode("p", [LeafNode(None, "caf\u00e9")])
+        fp = io.BytesIO()
+        node.write_html(fp)
+        self.assertEqual("<p>caf\u00e9</p>".encode("utf-8"), fp.getvalue())
+
+    def test_write_html_gzip(self):
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as fp:
+            self.node.write_html(fp)
+        self.assertEqual(
+            self.node.to_html().encode("utf-8"), gzip.decompress(buffer.getvalue())
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import imagesize
+from imagesize import ImageSizeCache, local_image_resolver, probe_image
+
+
+def png(width, height):
+    header = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR"
+    return header + struct.pack(">II", width, height) + b"\x08\x06\0\0\0" + b"\0" * 64
+
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\0" * 64
+
+
+def webp(chunk, payload):
+    body = chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body) + 4) + b"WEBP" + body
+
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    frame = b"\xff\xc2" + struct.pack(">HBHH", 17, 8, height, width) + b"\0" * 10
+    return b"\xff\xd8" + app0 + frame + b"\xff\xda" + b"\0" * 4096
+
+
+IMAGES = {
+    "a.png": (png(640, 480), (640, 480)),
+    "a.gif": (gif(32, 16), (32, 16)),
+    "lossy.webp": (
+        webp(b"VP8 ", b"\0\0\0\x9d\x01\x2a" + struct.pack("<HH", 300, 200)),
+        (300, 200),
+    ),
+    "lossless.webp": (
+        webp(b"VP8L", b"\x2f" + (99 | 49 << 14).to_bytes(4, "little")),
+        (100, 50),
+    ),
+    "extended.webp": (
+        webp(
+            b"VP8X",
+            b"\0" * 4 + (1919).to_bytes(3, "little") + (1079).to_bytes(3, "little"),
+        ),
+        (1920, 1080),
+    ),
+    "a.jpg": (jpeg(1024, 768), (1024, 768)),
+    "notes.txt": (b"not an image", None),
+    "broken.jpg": (b"\xff\xd8\xff\xe0\x00", None),
+}
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, "static")
+        os.makedirs(os.path.join(self.root, "img"))
+        for name, (data, _) in IMAGES.items():
+            self.write(f"img/{name}", data)
+        self.cache_path = os.path.join(tmp.name, "images.json")
+
+    def write(self, name, data):
+        with open(os.path.join(self.root, name), "wb") as fp:
+            fp.write(data)
+
+    def test_probe_formats(self):
+        for name, (_, expected) in IMAGES.items():
+            with self.subTest(name=name):
+                path = os.path.join(self.root, "img", name)
+                self.assertEqual(expected, probe_image(path))
+
+    def test_cache_hits_and_persists(self):
+        cache = ImageSizeCache(self.cache_path)
+        path = os.path.join(self.root, "img/a.png")
+        self.assertEqual((640, 480), cache.size(path))
+        self.assertEqual((640, 480), cache.size(path))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        cache.save()
+        cache = ImageSizeCache(self.cache_path)
+        with mock.patch.object(imagesize, "probe_image") as probe:
+            self.assertEqual((640, 480), cache.size(path))
+        probe.assert_not_called()
+
+    def test_changed_file_reprobed(self):
+        cache = ImageSizeCache()
+        path = os.path.join(self.root, "img/a.png")
+        cache.size(path)
+        self.write("img/a.png", png(10, 20) + b"\0")
+        self.assertEqual((10, 20), cache.size(path))
+        self.assertEqual(2, cache.misses)
+
+    def test_resolver(self):
+        image_size = local_image_resolver(self.root)
+        self.assertEqual((32, 16), image_size("/img/a.gif"))
+        self.assertEqual((32, 16), image_size("img/a.gif?v=2#top"))
+        for url in [
+            "https://example.com/img/a.gif",
+            "//cdn.example.com/img/a.gif",
+            "../outside/a.gif",
+            "/img/missing.png",
+            "/img/notes.txt",
+            "",
+        ]:
+            with self.subTest(url=url):
+                self.assertIsNone(image_size(url))
+
+    def test_relative_urls_resolve_against_page_dir(self):
+        os.makedirs(os.path.join(self.root, "blog", "img"))
+        self.write("blog/img/a.png", png(3, 4))
+        image_size = local_image_resolver(self.root, page_dir="blog")
+        self.assertEqual((3, 4), image_size("img/a.png"))
+        self.assertEqual((640, 480), image_size("/img/a.png"))
+        self.assertEqual((640, 480), image_size("../img/a.png"))
+        self.assertIsNone(image_size("../../img/a.png"))
+
+    def test_resolver_records_used_files(self):
+        used = {}
+        image_size = local_image_resolver(self.root, used=used)
+        image_size("/img/a.png")
+        image_size("/img/missing.png")
+        path = os.path.join(os.path.abspath(self.root), "img", "a.png")
+        stat = os.stat(path)
+        self.assertEqual(
+            {
+                path: [stat.st_size, stat.st_mtime_ns],
+                os.path.join(os.path.dirname(path), "missing.png"): None,
+            },
+            used,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from inlinecache import InlineCache
+from splitnodes import text_to_textnodes
+from textnode import TextType, text_node_to_html_node
+
+TEXT = "Some **bold** and a [link](https://example.com)"
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_textnodes_match_parser(self):
+        cache = InlineCache()
+        self.assertListEqual(text_to_textnodes(TEXT), cache.text_to_textnodes(TEXT))
+        self.assertListEqual(text_to_textnodes(TEXT), cache.text_to_textnodes(TEXT))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_html_matches_renderer(self):
+        cache = InlineCache()
+        expected = "".join(
+            text_node_to_html_node(node).to_html() for node in text_to_textnodes(TEXT)
+        )
+        self.assertEqual(expected, cache.text_to_html(TEXT))
+        self.assertEqual(expected, cache.text_to_html(TEXT))
+        self.assertEqual(
+            {"hits": 1, "misses": 1},
+            {key: cache.stats()[key] for key in ("hits", "misses")},
+        )
+
+    def test_copy_on_return(self):
+        cache = InlineCache()
+        nodes = cache.text_to_textnodes(TEXT)
+        nodes[0].text = "changed"
+        nodes[1].text_type = TextType.ITALIC
+        nodes.clear()
+        self.assertListEqual(text_to_textnodes(TEXT), cache.text_to_textnodes(TEXT))
+
+    def test_entry_limit_evicts_least_recent(self):
+        cache = InlineCache(max_entries=2)
+        cache.text_to_html("a")
+        cache.text_to_html("b")
+        cache.text_to_html("a")
+        cache.text_to_html("c")
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.evictions)
+        cache.text_to_html("a")
+        self.assertEqual(2, cache.hits)
+        cache.text_to_html("b")
+        self.assertEqual(4, cache.misses)
+
+    def test_byte_limit(self):
+        cache = InlineCache(max_bytes=500)
+        for i in range(20):
+            cache.text_to_html(f"text number {i}")
+        self.assertLessEqual(cache.size, 500)
+        self.assertGreater(cache.evictions, 0)
+
+    def test_oversized_value_not_cached(self):
+        cache = InlineCache(max_bytes=100)
+        text = "x" * 1000
+        self.assertEqual(text, cache.text_to_html(text))
+        self.assertEqual(0, len(cache))
+
+    def test_clear(self):
+        cache = InlineCache()
+        cache.text_to_textnodes(TEXT)
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size)
+        cache.text_to_textnodes(TEXT)
+        self.assertEqual(2, cache.misses)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            InlineCache(max_entries=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+
+from iopipeline import run_pipeline
+
+
+class TestRunPipeline(unittest.TestCase):
+    def test_results_in_item_order(self):
+        def read(item):
+            # Later items finish reading first.
+            time.sleep((10 - item) / 1000)
+            return item
+
+        results = run_pipeline(
+            range(10),
+            read,
+            lambda item, value: value * 2,
+            lambda item, value: (item, value),
+            concurrency=4,
+        )
+        self.assertListEqual([(i, i * 2) for i in range(10)], results)
+
+    def test_empty(self):
+        self.assertListEqual([], run_pipeline([], None, None, None))
+
+    def test_bounded_in_flight(self):
+        lock = threading.Lock()
+        loaded = [0, 0]
+
+        def read(item):
+            with lock:
+                loaded[0] += 1
+                loaded[1] = max(loaded[1], loaded[0])
+            return item
+
+        def write(item, value):
+            time.sleep(0.001)
+            with lock:
+                loaded[0] -= 1
+
+        run_pipeline(range(200), read, lambda item, value: value, write, 2)
+        # Two readers, two queue slots per stage, two renderers and two
+        # writers at most.
+        self.assertLessEqual(loaded[1], 10)
+
+    def test_errors_propagate(self):
+        def process(item, value):
+            if item == 3:
+                raise ValueError("bad page")
+            return value
+
+        with self.assertRaises(ValueError):
+            run_pipeline(range(10), lambda item: item, process, lambda i, v: v)
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            run_pipeline([1], None, None, None, concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import main
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.content = os.path.join(tmp.name, "content")
+        self.output = os.path.join(tmp.name, "public")
+        os.makedirs(self.content)
+        with open(os.path.join(self.content, "index.md"), "w") as fp:
+            fp.write("Hello **world**")
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(0, main.main(list(args)))
+        return out.getvalue()
+
+    def read(self, name):
+        with open(os.path.join(self.output, name)) as fp:
+            return fp.read()
+
+    def test_build(self):
+        out = self.run_main("build", self.content, self.output)
+        self.assertIn("Built 1 pages", out)
+        self.assertEqual(
+            "<div><p>Hello <b>world</b></p></div>", self.read("index.html")
+        )
+        out = self.run_main("build", self.content, self.output)
+        self.assertIn("skipped 1 unchanged", out)
+
+    def test_build_with_cache(self):
+        cache = os.path.join(self.root, "inline.bin")
+        out = self.run_main("build", self.content, self.output, "--cache", cache)
+        self.assertIn("Inline cache: 0 hits, 1 misses", out)
+        self.assertTrue(os.path.exists(cache))
+
+    def test_build_parallel(self):
+        out = self.run_main("build", self.content, self.output, "--jobs", "2")
+        self.assertIn("worker", out)
+        self.assertEqual(
+            "<div><p>Hello <b>world</b></p></div>", self.read("index.html")
+        )
+
+    def test_build_profile(self):
+        profile = os.path.join(self.root, "profile.json")
+        out = self.run_main(
+            "build", self.content, self.output, "--profile", "--profile-json", profile
+        )
+        self.assertIn("text_to_textnodes[scan]", out)
+        with open(profile) as fp:
+            self.assertIn("render_textnodes", json.load(fp))
+
+    def run_failing(self, *args):
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err):
+            with self.assertRaises(SystemExit) as raised:
+                main.main(list(args))
+        self.assertEqual(1, raised.exception.code)
+        return err.getvalue()
+
+    def test_build_missing_content(self):
+        missing = os.path.join(self.root, "missing")
+        err = self.run_failing("build", missing, self.output)
+        self.assertEqual(f"error: Content directory not found: {missing}\n", err)
+
+    def test_build_parse_error(self):
+        with open(os.path.join(self.content, "broken.md"), "w") as fp:
+            fp.write("Hello **world")
+        for jobs in ("1", "2"):
+            err = self.run_failing("build", self.content, self.output, "-j", jobs)
+            self.assertTrue(err.startswith("error: broken.md: "), err)
+
+    def test_convert(self):
+        destination = os.path.join(self.root, "index.html")
+        self.run_main("convert", os.path.join(self.content, "index.md"), destination)
+        with open(destination) as fp:
+            self.assertEqual("<div><p>Hello <b>world</b></p></div>", fp.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import unittest
+
+import splitnodes
+from build import build_site, render_page
+from htmlnode import LeafNode, ParentNode
+from profiling import Profiler
+from splitnodes import split_nodes_delimiter, text_to_textnodes
+from textnode import TextNode, TextType, text_node_to_html_node
+
+TEXT = "Some **bold** and _italic_ with a [link](https://example.com)"
+
+
+class TestProfiler(unittest.TestCase):
+    def test_records_passes_stages(self):
+        with Profiler() as profiler:
+            text_to_textnodes(TEXT, engine="passes")
+        self.assertEqual(
+            {
+                "text_to_textnodes[passes]",
+                "split_nodes_delimiter[**]",
+                "split_nodes_delimiter[_]",
+                "split_nodes_delimiter[`]",
+                "split_nodes_image",
+                "split_nodes_link",
+            },
+            set(profiler.stages),
+        )
+        bold = profiler.stages["split_nodes_delimiter[**]"]
+        self.assertEqual((1, 1, 3), (bold.calls, bold.nodes_in, bold.nodes_out))
+        link = profiler.stages["split_nodes_link"]
+        self.assertEqual(len(text_to_textnodes(TEXT)), link.nodes_out)
+
+    def test_records_scan_and_rendering(self):
+        with Profiler() as profiler:
+            nodes = text_to_textnodes(TEXT)
+            html = ParentNode("p", [text_node_to_html_node(n) for n in nodes]).to_html()
+        self.assertEqual(1, profiler.stages["text_to_textnodes[scan]"].calls)
+        self.assertEqual(len(nodes), profiler.stages["text_node_to_html_node"].calls)
+        self.assertEqual(len(nodes), profiler.stages["LeafNode.to_html"].calls)
+        self.assertEqual(len(html), profiler.stages["ParentNode.to_html[p]"].bytes)
+
+    def test_disabled_restores_originals(self):
+        originals = (
+            split_nodes_delimiter,
+            splitnodes.split_nodes_delimiter,
+            dict(splitnodes.ENGINES),
+            LeafNode.to_html,
+            ParentNode.to_html,
+        )
+        with Profiler():
+            self.assertIsNot(originals[1], splitnodes.split_nodes_delimiter)
+        self.assertEqual(
+            originals,
+            (
+                split_nodes_delimiter,
+                splitnodes.split_nodes_delimiter,
+                splitnodes.ENGINES,
+                LeafNode.to_html,
+                ParentNode.to_html,
+            ),
+        )
+        self.assertIsNone(Profiler.active)
+
+    def test_nothing_recorded_outside_block(self):
+        profiler = Profiler()
+        with profiler:
+            pass
+        text_to_textnodes(TEXT)
+        self.assertEqual({}, profiler.stages)
+
+    def test_nested_profilers_rejected(self):
+        with Profiler():
+            with self.assertRaises(RuntimeError):
+                Profiler().__enter__()
+
+    def test_results_unchanged(self):
+        with Profiler():
+            nodes = split_nodes_delimiter(
+                [TextNode("a **b** c", TextType.TEXT)], "**", TextType.BOLD
+            )
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("b", TextType.BOLD),
+                TextNode(" c", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_page_rendering(self):
+        source = f"# Title\n\n{TEXT} and ![img](/a.png)".encode()
+        expected = render_page(source)
+        with Profiler() as profiler:
+            self.assertEqual(expected, render_page(source))
+        self.assertIn("text_to_textnodes[scan]", profiler.stages)
+        self.assertIn("render_textnodes", profiler.stages)
+
+    def test_site_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as fp:
+                fp.write(TEXT)
+            with Profiler() as profiler:
+                stats = build_site(content, os.path.join(tmp, "public"))
+        self.assertEqual(1, stats["built"])
+        self.assertEqual(1, profiler.stages["text_to_textnodes[scan]"].calls)
+
+    def test_exports(self):
+        with Profiler() as profiler:
+            text_to_textnodes(TEXT)
+        data = json.loads(profiler.to_json())
+        self.assertEqual(1, data["text_to_textnodes[scan]"]["calls"])
+        self.assertIn("text_to_textnodes[scan]", profiler.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from sharednodes import NodeTable
+
+
+def nav():
+    return ParentNode(
+        "nav",
+        [
+            LeafNode("a", "Home", {"href": "/"}),
+            LeafNode("a", "Blog", {"href": "/blog"}),
+        ],
+        {"class": "site-nav"},
+    )
+
+
+class TestNodeTable(unittest.TestCase):
+    def test_identical_leaves_shared(self):
+        table = NodeTable()
+        a = table.leaf("a", "Home", {"href": "/"})
+        b = table.leaf("a", "Home", {"href": "/"})
+        self.assertIs(a, b)
+        self.assertIsNot(a, table.leaf("a", "Home", {"href": "/home"}))
+        self.assertEqual((1, 2), (table.hits, table.misses))
+
+    def test_identical_subtrees_shared(self):
+        table = NodeTable()
+        first = table.intern(nav())
+        second = table.intern(nav())
+        self.assertIs(first, second)
+        self.assertIs(first.children[0], second.children[0])
+        self.assertEqual(3, len(table))
+        self.assertGreater(table.stats()["bytes_saved"], 0)
+
+    def test_same_html_as_plain_nodes(self):
+        table = NodeTable()
+        page = ParentNode("div", [nav(), LeafNode("p", "a < b")])
+        self.assertEqual(page.to_html(), table.intern(page).to_html())
+
+    def test_rendering_cached(self):
+        table = NodeTable()
+        shared_nav = table.intern(nav())
+        pages = [
+            ParentNode("body", [shared_nav, LeafNode("p", f"page {i}")])
+            for i in range(10)
+        ]
+        for page in pages:
+            self.assertEqual(
+                f"<body>{nav().to_html()}<p>page {pages.index(page)}</p></body>",
+                page.to_html(),
+            )
+        stats = table.stats()
+        # The nav and both links render once; later pages reuse the nav.
+        self.assertEqual(3, stats["render_misses"])
+        self.assertEqual(9, stats["render_hits"])
+
+    def test_immutable(self):
+        table = NodeTable()
+        node = table.intern(nav())
+        with self.assertRaises(AttributeError):
+            node.tag = "div"
+        with self.assertRaises(TypeError):
+            node.props["class"] = "other"
+        with self.assertRaises(AttributeError):
+            node.children.append(LeafNode("b", "x"))
+
+    def test_props_copied(self):
+        table = NodeTable()
+        props = {"href": "/"}
+        node = table.leaf("a", "Home", props)
+        props["href"] = "/changed"
+        self.assertEqual('<a href="/">Home</a>', node.to_html())
+
+    def test_children_must_be_shared(self):
+        table = NodeTable()
+        with self.assertRaises(TypeError):
+            table.parent("div", [LeafNode("b", "x")])
+        with self.assertRaises(TypeError):
+            table.parent("div", [NodeTable().leaf("b", "x")])
+
+    def test_unused_nodes_released(self):
+        table = NodeTable()
+        table.intern(nav())
+        self.assertEqual(0, len(table))
+
+    def test_deep_tree(self):
+        node = LeafNode("b", "x")
+        for _ in range(1_500):
+            node = ParentNode("div", [node])
+        shared = NodeTable().intern(node)
+        self.assertEqual(node.to_html(), shared.to_html())
+
+    def test_deep_chain_caches_only_root(self):
+        node = LeafNode("b", "x")
+        for _ in range(50_000):
+            node = ParentNode("div", [node])
+        table = NodeTable()
+        shared = table.intern(node)
+        self.assertEqual(node.to_html(), shared.to_html())
+        # Only the root and the leaf keep their HTML; the chain in between
+        # is streamed, not cached at every level.
+        self.assertEqual(2, table.stats()["render_misses"])
+
+    def test_subtrees_interned_twice_cached(self):
+        table = NodeTable()
+        pages = [
+            table.intern(ParentNode("body", [nav(), LeafNode("p", f"page {i}")]))
+            for i in range(3)
+        ]
+        self.assertEqual(
+            f"<body>{nav().to_html()}<p>page 0</p></body>",
+            "".join(pages[0].iter_html()),
+        )
+        # The nav is cached along with its links and the paragraph; the page
+        # itself was only streamed.
+        self.assertEqual(4, table.stats()["render_misses"])
+        for page in pages[1:]:
+            page.to_html()
+        self.assertEqual(3, table.stats()["render_hits"])
+
+
+if __name__ == "__main__":
+    unittest.main()
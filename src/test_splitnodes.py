@@ -1,12 +1,19 @@
 import unittest
 
+from mdextraction import extract_markdown_images, extract_markdown_links
 from splitnodes import (
+    ENGINES,
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
+    reparse_textnodes,
+    text_to_html_many,
     text_to_textnodes,
+    text_to_textnodes_many,
+    text_to_textnodes_passes,
+    text_to_textnodes_scan,
 )
-from textnode import TextNode, TextType
+from textnode import TextNode, TextType, render_textnodes
 
 
 class TestSplitNodes(unittest.TestCase):
@@ -329,6 +336,44 @@ class TestSplitNodes(unittest.TestCase):
             result,
         )
 
+    def test_split_many_unmatched_brackets(self):
+        text = "[" * 50_000 + "](" + "(" * 50_000
+        node = TextNode(text, TextType.TEXT)
+        self.assertListEqual([node], split_nodes_link([node]))
+        self.assertListEqual([node], split_nodes_image([node]))
+
+    def test_split_links_nested_open_bracket(self):
+        node = TextNode("[a[b](c) and ![x]y](z)", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("a[b", TextType.LINK, "c"),
+                TextNode(" and ![x]y](z)", TextType.TEXT),
+            ],
+            split_nodes_link([node]),
+        )
+
+    def test_split_stops_at_newlines(self):
+        for text in ["[a\nb](z)", "[a](b\nc)", "![a\nb](z)", "![a](b\nc)"]:
+            with self.subTest(text=text):
+                node = TextNode(text, TextType.TEXT)
+                self.assertListEqual([node], split_nodes_link([node]))
+                self.assertListEqual([node], split_nodes_image([node]))
+                self.assertListEqual([], extract_markdown_links(text))
+                self.assertListEqual([], extract_markdown_images(text))
+                self.assertListEqual([node], text_to_textnodes_scan(text))
+
+    def test_split_links_after_newline(self):
+        node = TextNode("[a\n[b](c) ![d](e\n", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("[a\n", TextType.TEXT),
+                TextNode("b", TextType.LINK, "c"),
+                TextNode(" ![d](e\n", TextType.TEXT),
+            ],
+            split_nodes_link([node]),
+        )
+        self.assertListEqual([("b", "c")], extract_markdown_links(node.text))
+
     def test_to_textnodes(self):
         self.assertListEqual(
             [
@@ -349,3 +394,213 @@ class TestSplitNodes(unittest.TestCase):
                 "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://youtube.com)"
             ),
         )
+
+
+class TestInlineEngines(unittest.TestCase):
+    cases = [
+        "",
+        "Just plain text",
+        "Start **bold** and **end**",
+        "This is **** odd",
+        "**bold at start** and **end**",
+        "a ***b*** c",
+        "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://youtube.com)",
+        "![](https://ex.com/img.png)",
+        "[](https://ex.com)",
+        "  ![alt](https://ex.com/img.png)  ",
+        "![logo](https://ex.com/logo.png) visit [site](https://ex.com)",
+        "!![a](b) and [c] (d) and [e](f",
+        "[a[b](c) and ![x]y](z)",
+        "**[not a link](url)** then `![not an image](src)`",
+        "Build [![status](https://ci/badge.svg)](https://ci/job) ok",
+        "[a](x![b](y) and [![c](d)",
+        "[**x**](u) and ![_y_](v)",
+        "[ _]()_",
+        "[a `b`](c) ![d](e `f`)",
+        "[a\nb](c) ![d](e\nf) [g](h)\n![i](j)",
+    ]
+
+    def test_engines_agree(self):
+        for text in self.cases:
+            with self.subTest(text=text):
+                self.assertListEqual(
+                    text_to_textnodes_passes(text), text_to_textnodes_scan(text)
+                )
+
+    def test_engine_switch(self):
+        text = "A **b** and [c](d)"
+        self.assertListEqual(
+            text_to_textnodes(text, engine="passes"),
+            text_to_textnodes(text, engine="scan"),
+        )
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("text", engine="nope")
+
+    def test_scan_unmatched_delimiter_raises(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes_scan("This **never closes")
+
+    def test_linked_image_is_an_image(self):
+        self.assertListEqual(
+            [
+                TextNode("[", TextType.TEXT),
+                TextNode("status", TextType.IMAGE, "https://ci/badge.svg"),
+                TextNode("](https://ci/job)", TextType.TEXT),
+            ],
+            text_to_textnodes_scan("[![status](https://ci/badge.svg)](https://ci/job)"),
+        )
+
+    def test_scan_code_keeps_underscores(self):
+        self.assertListEqual(
+            [
+                TextNode("call ", TextType.TEXT),
+                TextNode("snake_case_name", TextType.CODE),
+            ],
+            text_to_textnodes_scan("call `snake_case_name`"),
+        )
+
+    def test_scan_unclosed_brackets(self):
+        text = "[" * 1000 + "](x"
+        self.assertListEqual(
+            [TextNode(text, TextType.TEXT)], text_to_textnodes_scan(text)
+        )
+
+
+class TestManyStrings(unittest.TestCase):
+    texts = TestInlineEngines.cases + ["a < b & c", "plain", "", "**x** < y"]
+
+    def test_textnodes_many_matches_single_calls(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertListEqual(
+                    [text_to_textnodes(text, engine) for text in self.texts],
+                    list(text_to_textnodes_many(self.texts, engine)),
+                )
+
+    def test_html_many_matches_single_calls(self):
+        for raw in (False, True):
+            with self.subTest(raw=raw):
+                self.assertListEqual(
+                    [
+                        render_textnodes(text_to_textnodes(text), raw)
+                        for text in self.texts
+                    ],
+                    list(text_to_html_many(self.texts, raw=raw)),
+                )
+
+    def test_plain_text_fast_path(self):
+        self.assertListEqual(
+            [[TextNode("a * b! c", TextType.TEXT)], []],
+            list(text_to_textnodes_many(["a * b! c", ""])),
+        )
+
+    def test_lazy(self):
+        def texts():
+            yield "**a**"
+            raise AssertionError("consumed too far")
+
+        results = text_to_textnodes_many(texts())
+        self.assertListEqual([TextNode("a", TextType.BOLD)], next(results))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes_many([], engine="nope")
+        with self.assertRaises(Exception):
+            list(text_to_html_many(["fine", "**broken"]))
+
+
+class TestSourceSpans(unittest.TestCase):
+    def test_spans_cover_markup(self):
+        text = "a **b** _c_ `d` [e](f) ![g](h) i"
+        markup = [text[node.start : node.end] for node in text_to_textnodes(text)]
+        self.assertListEqual(
+            [
+                "a ",
+                "**b**",
+                " ",
+                "_c_",
+                " ",
+                "`d`",
+                " ",
+                "[e](f)",
+                " ",
+                "![g](h)",
+                " i",
+            ],
+            markup,
+        )
+
+    def test_engines_agree_on_spans(self):
+        for text in TestInlineEngines.cases:
+            with self.subTest(text=text):
+                self.assertListEqual(
+                    [(n.start, n.end) for n in text_to_textnodes_passes(text)],
+                    [(n.start, n.end) for n in text_to_textnodes_scan(text)],
+                )
+
+    def test_split_offsets_relative_to_parent(self):
+        node = TextNode("x **b** y", TextType.TEXT, None, 10, 19)
+        nodes = split_nodes_delimiter([node], "**", TextType.BOLD)
+        self.assertListEqual(
+            [(10, 12), (12, 17), (17, 19)], [(n.start, n.end) for n in nodes]
+        )
+        link = split_nodes_link([TextNode("see [a](b)", TextType.TEXT, None, 5, 15)])
+        self.assertListEqual([(5, 9), (9, 15)], [(n.start, n.end) for n in link])
+
+    def test_spans_optional(self):
+        nodes = split_nodes_delimiter(
+            [TextNode("x **b**", TextType.TEXT)], "**", TextType.BOLD
+        )
+        self.assertListEqual([None, None], [node.start for node in nodes])
+
+
+class TestReparse(unittest.TestCase):
+    def check(self, text, offset, removed, inserted):
+        nodes = text_to_textnodes(text)
+        new_text, new_nodes = reparse_textnodes(text, nodes, offset, removed, inserted)
+        self.assertEqual(text[:offset] + inserted + text[offset + removed :], new_text)
+        expected = text_to_textnodes(new_text)
+        self.assertListEqual(expected, new_nodes)
+        self.assertListEqual(
+            [(n.start, n.end) for n in expected], [(n.start, n.end) for n in new_nodes]
+        )
+        return nodes, new_nodes
+
+    def test_edits(self):
+        cases = [
+            ("a **b** c _d_ e", 4, 1, "x"),
+            ("a **b** c _d_ e", 0, 0, "**z** "),
+            ("a **b** c _d_ e", 15, 0, " `f`"),
+            ("a **b** c", 2, 5, ""),
+            ("see [a](b) and ![c](d)", 16, 1, ""),
+            ("[a](bc [d] e", 12, 0, ")"),
+            ("[a] (b) [c](d)", 3, 1, ""),
+            ("a****b", 3, 0, "x"),
+            ("text ! [x](y)", 6, 1, ""),
+            ("", 0, 0, "**a**"),
+            ("[a](x![b) zz", 12, 0, "](y)"),
+            ("[a](b) c", 3, 0, "**d** "),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.check(*case)
+
+    def test_reuses_nodes_outside_edit(self):
+        text = " ".join(f"**w{i}** and _x{i}_" for i in range(50))
+        offset = text.index("w25") + 1
+        nodes, new_nodes = self.check(text, offset, 1, "Z")
+        self.assertIs(nodes[0], new_nodes[0])
+        self.assertIs(nodes[-1], new_nodes[-1])
+        nodes, shifted = self.check(text, offset, 0, "Z")
+        self.assertIs(nodes[0], shifted[0])
+        self.assertEqual(nodes[-1].start + 1, shifted[-1].start)
+
+    def test_broken_edit_raises(self):
+        with self.assertRaises(Exception):
+            self.check("a **b** c", 5, 2, "")
+
+    def test_edit_outside_text(self):
+        with self.assertRaises(ValueError):
+            reparse_textnodes("abc", text_to_textnodes("abc"), 2, 5, "")
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import templates
+from htmlnode import LeafNode, ParentNode
+from templates import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compiles_chunks_and_slots(self):
+        template = Template("<title>{{ title }}</title><main>{{content}}</main>")
+        self.assertEqual((b"<title>", b"</title><main>", b"</main>"), template.chunks)
+        self.assertEqual(("title", "content"), template.slots)
+
+    def test_render(self):
+        template = Template("<h1>{{ title }}</h1>{{ content }}")
+        node = ParentNode("p", [LeafNode("b", "x")])
+        self.assertEqual(
+            b"<h1>Fish &amp; chips</h1><p><b>x</b></p>",
+            template.render({"title": "Fish & chips", "content": node}),
+        )
+
+    def test_bytes_are_inserted_verbatim(self):
+        template = Template("<main>{{ content }}</main>")
+        self.assertEqual(
+            b"<main><p>&</p></main>", template.render({"content": b"<p>&</p>"})
+        )
+
+    def test_repeated_slot(self):
+        template = Template("{{ a }}-{{ b }}-{{ a }}")
+        self.assertEqual(("a", "b"), template.names)
+        self.assertEqual(b"1-2-1", template.render({"a": 1, "b": 2}))
+
+    def test_no_slots(self):
+        self.assertEqual(b"<p>static</p>", Template("<p>static</p>").render({}))
+
+    def test_unknown_braces_are_static(self):
+        template = Template("{{ not a slot }} {x}")
+        self.assertEqual((), template.slots)
+        self.assertEqual(b"{{ not a slot }} {x}", template.render({}))
+
+    def test_missing_value(self):
+        with self.assertRaises(ValueError):
+            Template("{{ title }}{{ content }}").render({"title": "x"})
+
+    def test_iter_render_matches_render(self):
+        template = Template("<body>{{ content }}<p>{{ title }}</p></body>")
+        node = ParentNode("div", [LeafNode("p", "a < b"), LeafNode(None, "c")])
+        values = {"content": node, "title": "<t>"}
+        self.assertEqual(
+            template.render(values), b"".join(template.iter_render(values))
+        )
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "page.html")
+        self.addCleanup(templates._compiled.clear)
+
+    def write(self, text, mtime):
+        with open(self.path, "w") as fp:
+            fp.write(text)
+        os.utime(self.path, ns=(mtime, mtime))
+
+    def test_cached_until_changed(self):
+        self.write("<p>{{ content }}</p>", 1_000_000_000)
+        template = load_template(self.path)
+        self.assertIs(template, load_template(self.path))
+        self.write("<div>{{ content }}</div>", 2_000_000_000)
+        changed = load_template(self.path)
+        self.assertIsNot(template, changed)
+        self.assertEqual(b"<div>x</div>", changed.render({"content": "x"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from splitnodes import text_to_textnodes
+from textbatch import TextNodeBatch, text_to_textnode_batch
+from textnode import TextNode, TextType, text_node_to_html_node
+
+TEXT = (
+    "This is **text** with an _italic_ word and a `code block` and an "
+    "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a "
+    "[link](https://youtube.com) and [again](https://youtube.com)"
+)
+
+
+class TestTextNodeBatch(unittest.TestCase):
+    def test_equals_textnodes(self):
+        batch = text_to_textnode_batch(TEXT)
+        self.assertEqual(text_to_textnodes(TEXT), batch)
+        self.assertEqual(batch, text_to_textnodes(TEXT))
+
+    def test_iterates_as_textnodes(self):
+        self.assertListEqual(
+            text_to_textnodes(TEXT), list(text_to_textnode_batch(TEXT))
+        )
+
+    def test_len_and_index(self):
+        batch = text_to_textnode_batch(TEXT)
+        nodes = text_to_textnodes(TEXT)
+        self.assertEqual(len(nodes), len(batch))
+        self.assertEqual(nodes[1], batch[1])
+        self.assertEqual(nodes[-1], batch[-1])
+        self.assertListEqual(nodes[2:6], batch[2:6])
+        with self.assertRaises(IndexError):
+            batch[len(nodes)]
+
+    def test_not_equal(self):
+        batch = text_to_textnode_batch("Just **bold**")
+        self.assertNotEqual(batch, [TextNode("Just ", TextType.TEXT)])
+        self.assertNotEqual(batch, text_to_textnode_batch("Just _bold_"))
+
+    def test_urls_interned(self):
+        batch = text_to_textnode_batch(TEXT)
+        self.assertEqual(
+            ["https://i.imgur.com/fJRm4Vk.jpeg", "https://youtube.com"], batch.urls
+        )
+
+    def test_to_html_matches_leaf_nodes(self):
+        expected = "".join(
+            text_node_to_html_node(node).to_html() for node in text_to_textnodes(TEXT)
+        )
+        self.assertEqual(expected, text_to_textnode_batch(TEXT).to_html())
+
+    def test_to_html_escapes(self):
+        text = 'a < b **&** [x&y](?a=1&b="2") ![<alt>](i.png?a&b)'
+        expected = "".join(
+            text_node_to_html_node(node).to_html() for node in text_to_textnodes(text)
+        )
+        batch = text_to_textnode_batch(text)
+        self.assertEqual(expected, batch.to_html())
+        self.assertIn("<b>&</b>", batch.to_html(raw=True))
+
+    def test_empty(self):
+        batch = TextNodeBatch.from_text("")
+        self.assertEqual(0, len(batch))
+        self.assertEqual("", batch.to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import (
+    TextNode,
+    TextType,
+    iter_textnodes_html,
+    render_textnodes,
+    text_node_to_html_node,
+)
 
 
 class TestTextNode(unittest.TestCase):
@@ -14,6 +20,12 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is also a text node", TextType.BOLD, "www.google.com")
         self.assertNotEqual(node, node2)
 
+    def test_spans_ignored_by_eq(self):
+        node = TextNode("text", TextType.BOLD, None, 0, 8)
+        self.assertEqual(TextNode("text", TextType.BOLD), node)
+        self.assertEqual((0, 8), (node.start, node.end))
+        self.assertIsNone(TextNode("text", TextType.BOLD).start)
+
     def test_repr(self):
         node = TextNode("This is a text node", TextType.ITALIC)
         self.assertEqual("TextNode(This is a text node, italic, None)", repr(node))
@@ -24,6 +36,10 @@ class TestTextNode(unittest.TestCase):
             "TextNode(This is a text node, text, www.google.com)", repr(node)
         )
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_text_plain(self):
         node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(node)
@@ -31,5 +47,74 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.value, "This is a text node")
 
 
+class TestRenderTextNodes(unittest.TestCase):
+    nodes = [
+        TextNode("plain ", TextType.TEXT),
+        TextNode("bold", TextType.BOLD),
+        TextNode("italic", TextType.ITALIC),
+        TextNode("code", TextType.CODE),
+        TextNode("link", TextType.LINK, "https://example.com"),
+        TextNode("alt text", TextType.IMAGE, "https://example.com/a.png"),
+    ]
+
+    def test_matches_leaf_nodes(self):
+        for node in self.nodes:
+            with self.subTest(node=node):
+                self.assertEqual(
+                    text_node_to_html_node(node).to_html(), render_textnodes([node])
+                )
+
+    def test_render_sequence(self):
+        self.assertEqual(
+            'plain <b>bold</b><i>italic</i><code>code</code><a href="https://example.com">link</a><img src="https://example.com/a.png" alt="alt text"></img>',
+            render_textnodes(self.nodes),
+        )
+
+    def test_streaming(self):
+        chunks = list(iter_textnodes_html(self.nodes))
+        self.assertEqual(len(self.nodes), len(chunks))
+        self.assertEqual(render_textnodes(self.nodes), "".join(chunks))
+
+    def test_escaped_like_leaf_nodes(self):
+        nodes = [
+            TextNode("a < b & c", TextType.TEXT),
+            TextNode("<b>", TextType.CODE),
+            TextNode("x & y", TextType.LINK, "https://ex.com/?a=1&b=2"),
+            TextNode('"quoted" alt', TextType.IMAGE, "img.png?w=1&h=2"),
+        ]
+        self.assertEqual(
+            "".join(text_node_to_html_node(node).to_html() for node in nodes),
+            render_textnodes(nodes),
+        )
+
+    def test_raw(self):
+        nodes = [TextNode("<em>", TextType.BOLD), TextNode("x", TextType.LINK, "?a&b")]
+        self.assertEqual(
+            '<b><em></b><a href="?a&b">x</a>', render_textnodes(nodes, raw=True)
+        )
+
+    def test_image_sizes(self):
+        sizes = {"/a.png": (640, 480)}
+        nodes = [
+            TextNode("a", TextType.IMAGE, "/a.png"),
+            TextNode("b", TextType.IMAGE, "/unknown.png"),
+        ]
+        expected = (
+            '<img src="/a.png" alt="a" width="640" height="480"></img>'
+            '<img src="/unknown.png" alt="b"></img>'
+        )
+        self.assertEqual(expected, render_textnodes(nodes, image_size=sizes.get))
+        self.assertEqual(
+            expected,
+            "".join(
+                text_node_to_html_node(node, sizes.get).to_html() for node in nodes
+            ),
+        )
+
+    def test_invalid_type(self):
+        with self.assertRaises(Exception):
+            render_textnodes([TextNode("x", "underline")])
+
+
 if __name__ == "__main__":
     unittest.main()
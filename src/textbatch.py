@@ -0,0 +1,112 @@
+import sys
+from array import array
+
+from htmlnode import escape_attribute, escape_text
+from splitnodes import scan_inline
+from textnode import TextNode, TextType
+
+TYPE_CODES = tuple(TextType)
+
+_CODE_OF = {text_type: code for code, text_type in enumerate(TYPE_CODES)}
+
+_TAGS = {
+    TextType.TEXT: ("", ""),
+    TextType.BOLD: ("<b>", "</b>"),
+    TextType.ITALIC: ("<i>", "</i>"),
+    TextType.CODE: ("<code>", "</code>"),
+}
+
+_LINK = _CODE_OF[TextType.LINK]
+_IMAGE = _CODE_OF[TextType.IMAGE]
+
+
+class TextNodeBatch:
+    # Columnar stand-in for a list of TextNodes. Node text is kept as
+    # (start, end) offsets into the source string, text types as one byte
+    # each and URLs as indices into a per-batch table of distinct URLs.
+    __slots__ = ("source", "starts", "ends", "types", "url_ids", "urls")
+
+    def __init__(self, source):
+        self.source = source
+        self.starts = array("q")
+        self.ends = array("q")
+        self.types = array("B")
+        self.url_ids = array("l")
+        self.urls = []
+
+    @classmethod
+    def from_text(cls, text):
+        batch = cls(text)
+        url_index = {}
+        for text_type, start, end, url in scan_inline(text):
+            batch.starts.append(start)
+            batch.ends.append(end)
+            batch.types.append(_CODE_OF[text_type])
+            if url is None:
+                batch.url_ids.append(-1)
+                continue
+            if url not in url_index:
+                url_index[url] = len(batch.urls)
+                batch.urls.append(sys.intern(url))
+            batch.url_ids.append(url_index[url])
+        return batch
+
+    def node(self, i):
+        url_id = self.url_ids[i]
+        return TextNode(
+            self.source[self.starts[i] : self.ends[i]],
+            TYPE_CODES[self.types[i]],
+            None if url_id == -1 else self.urls[url_id],
+        )
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.node(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TextNodeBatch index out of range")
+        return self.node(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.node(i)
+
+    def __eq__(self, other):
+        if isinstance(other, TextNodeBatch):
+            other = list(other)
+        if not isinstance(other, list):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def iter_html(self, raw=False):
+        source = self.source
+        urls = self.urls if raw else [escape_attribute(url) for url in self.urls]
+        for start, end, code, url_id in zip(
+            self.starts, self.ends, self.types, self.url_ids
+        ):
+            text = source[start:end]
+            if code == _IMAGE:
+                alt = text if raw else escape_attribute(text)
+                yield f'<img src="{urls[url_id]}" alt="{alt}"></img>'
+                continue
+            if not raw:
+                text = escape_text(text)
+            if code == _LINK:
+                yield f'<a href="{urls[url_id]}">{text}</a>'
+            else:
+                open_tag, close_tag = _TAGS[TYPE_CODES[code]]
+                yield f"{open_tag}{text}{close_tag}"
+
+    def to_html(self, raw=False):
+        return "".join(self.iter_html(raw))
+
+
+def text_to_textnode_batch(text):
+    return TextNodeBatch.from_text(text)
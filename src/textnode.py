@@ -1,5 +1,5 @@
 from enum import Enum
-from htmlnode import LeafNode
+from htmlnode import LeafNode, escape_attribute, escape_text
 
 
 class TextType(Enum):
@@ -12,10 +12,17 @@ class TextType(Enum):
 
 
 class TextNode:
-    def __init__(self, text, text_type, url=None):
+    # start/end, when known, locate the node's markup in the parsed string,
+    # so source[start:end] is e.g. "**bold**". They take no part in
+    # equality.
+    __slots__ = ("text", "text_type", "url", "start", "end")
+
+    def __init__(self, text, text_type, url=None, start=None, end=None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        self.start = start
+        self.end = end
 
     def __eq__(self, other):
         if (
@@ -30,7 +37,17 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node):
+def image_props(text_node, image_size=None):
+    # image_size maps an image URL to (width, height), or None if unknown.
+    props = {"src": text_node.url, "alt": text_node.text}
+    if image_size is not None:
+        size = image_size(text_node.url)
+        if size is not None:
+            props["width"], props["height"] = str(size[0]), str(size[1])
+    return props
+
+
+def text_node_to_html_node(text_node, image_size=None):
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -43,6 +60,52 @@ def text_node_to_html_node(text_node):
         case TextType.LINK:
             return LeafNode("a", text_node.text, {"href": text_node.url})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            return LeafNode("img", "", image_props(text_node, image_size))
         case _:
             raise Exception("Invalid TextType")
+
+
+# Direct TextNode -> HTML renderers, producing the same markup as
+# text_node_to_html_node(node).to_html() without building a LeafNode.
+HTML_RENDERERS = {
+    TextType.TEXT: lambda node: escape_text(node.text),
+    TextType.BOLD: lambda node: f"<b>{escape_text(node.text)}</b>",
+    TextType.ITALIC: lambda node: f"<i>{escape_text(node.text)}</i>",
+    TextType.CODE: lambda node: f"<code>{escape_text(node.text)}</code>",
+    TextType.LINK: lambda node: (
+        f'<a href="{escape_attribute(str(node.url))}">{escape_text(node.text)}</a>'
+    ),
+    TextType.IMAGE: lambda node: (
+        f'<img src="{escape_attribute(str(node.url))}" '
+        f'alt="{escape_attribute(node.text)}"></img>'
+    ),
+}
+
+RAW_HTML_RENDERERS = {
+    TextType.TEXT: lambda node: node.text,
+    TextType.BOLD: lambda node: f"<b>{node.text}</b>",
+    TextType.ITALIC: lambda node: f"<i>{node.text}</i>",
+    TextType.CODE: lambda node: f"<code>{node.text}</code>",
+    TextType.LINK: lambda node: f'<a href="{node.url}">{node.text}</a>',
+    TextType.IMAGE: lambda node: f'<img src="{node.url}" alt="{node.text}"></img>',
+}
+
+
+def iter_textnodes_html(text_nodes, raw=False, image_size=None):
+    renderers = RAW_HTML_RENDERERS if raw else HTML_RENDERERS
+    if image_size is not None:
+        renderers = {
+            **renderers,
+            TextType.IMAGE: lambda node: LeafNode(
+                "img", "", image_props(node, image_size), raw=raw
+            ).to_html(),
+        }
+    for node in text_nodes:
+        renderer = renderers.get(node.text_type)
+        if renderer is None:
+            raise Exception("Invalid TextType")
+        yield renderer(node)
+
+
+def render_textnodes(text_nodes, raw=False, image_size=None):
+    return "".join(iter_textnodes_html(text_nodes, raw, image_size))